@@ -8,13 +8,24 @@ Provides a unified interface for both databases, handling:
 
 import asyncio
 import os
+import sqlite3
 import sys
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from typing import Any, Optional, Sequence
 
-from worklog_mcp.config import Backend, get_backend, get_sqlite_path, get_postgresql_params
+from worklog_mcp.config import (
+    is_postgresql,
+    Backend,
+    get_backend,
+    get_pool_size,
+    get_sqlite_path,
+    get_postgresql_params,
+    get_statement_cache_size,
+    is_fts_check_enabled,
+)
 
 
 class DatabaseError(Exception):
@@ -30,6 +41,12 @@ class UniqueViolationError(DatabaseError):
 class DatabaseBackend(ABC):
     """Abstract base class for database backends."""
 
+    # True when fts_match()/fts_query() can replace LIKE scans for text search
+    supports_fts = False
+
+    # True when INSERT/UPDATE/DELETE ... RETURNING is available
+    supports_returning = True
+
     @abstractmethod
     async def connect(self) -> None:
         """Establish connection to the database."""
@@ -40,11 +57,23 @@ class DatabaseBackend(ABC):
         """Close the database connection."""
         pass
 
+    async def __aenter__(self) -> "DatabaseBackend":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
     @abstractmethod
     async def execute(self, query: str, *args: Any) -> str:
         """Execute a query without returning rows."""
         pass
 
+    @abstractmethod
+    async def executemany(self, query: str, args_seq: Sequence[Sequence[Any]]) -> None:
+        """Execute a query once per argument tuple, atomically."""
+        pass
+
     @abstractmethod
     async def fetchone(self, query: str, *args: Any) -> Optional[dict]:
         """Execute a query and return one row."""
@@ -56,32 +85,120 @@ class DatabaseBackend(ABC):
         pass
 
     @abstractmethod
-    def placeholder(self, index: int) -> str:
+    def transaction(self):
+        """Async context manager running the enclosed statements atomically.
+
+        Statements issued by the same task inside the block share one
+        transaction and one commit; nested blocks join the outer one.
+        """
+        pass
+
+    # SQL dialect helpers are static: their output depends only on the backend
+    # class, so server.py caches SQL built from them per class, not per instance
+
+    @staticmethod
+    @abstractmethod
+    def placeholder(index: int) -> str:
         """Get the placeholder for parameterized queries (? or $N)."""
         pass
 
+    @staticmethod
     @abstractmethod
-    def interval_days(self, days: int) -> str:
+    def interval_days(days: int) -> str:
         """Get SQL for 'N days ago' comparison."""
         pass
 
+    @staticmethod
     @abstractmethod
-    def ilike(self, column: str, placeholder: str) -> str:
-        """Get SQL for case-insensitive LIKE."""
+    def ilike(column: str, placeholder: str, escape: bool = False) -> str:
+        """Get SQL for case-insensitive LIKE.
+
+        With escape=True, backslash escapes % and _ in the pattern (see
+        server._escape_search_wildcards).
+        """
         pass
 
+    @staticmethod
     @abstractmethod
-    def array_contains(self, column: str, placeholder: str) -> str:
+    def array_contains(column: str, placeholder: str) -> str:
         """Get SQL for checking if column value is in array parameter."""
         pass
 
+    async def prewarm(self) -> None:
+        """Pull hot data into the cache ahead of the first tool call (optional)."""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def fts_match(table: str, placeholder: str) -> str:
+        """Get SQL restricting table rows to a full-text match (see supports_fts)."""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def fts_query(columns: Sequence[str], term: str) -> str:
+        """Build the full-text query matching term as a substring of columns."""
+        pass
+
+
+# Columns indexed for full-text search, per table (superset of what
+# search_knowledge and recall_context match against)
+FTS_COLUMNS = {
+    "memories": ("key", "content", "summary", "tags"),
+    "knowledge_base": ("title", "content", "tags", "category"),
+    "entries": ("title", "details", "outcome", "tags"),
+    "research": ("title", "summary", "key_points", "tags"),
+}
+
+# Trigram tokens: MATCH needs at least this many characters
+FTS_MIN_TERM_LENGTH = 3
+
+# Backslash-escape table for LIKE patterns
+_LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
 
 class SQLiteBackend(DatabaseBackend):
     """SQLite backend using aiosqlite."""
 
+    # RETURNING arrived in SQLite 3.35; older system libraries lack it
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    # Write-ahead logging with relaxed fsync: commits no longer wait on a
+    # full journal sync, and readers don't block the writer.
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=10000",
+    )
+
+    # Read-only connections only need the per-connection cache settings;
+    # query_only guards against a write slipping onto one.
+    READER_PRAGMAS = (
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=10000",
+        "PRAGMA query_only=ON",
+    )
+
+    # Each aiosqlite connection runs its statements on one thread; a few
+    # readers let SELECTs proceed in parallel with each other and the writer
+    MAX_READERS = 4
+
     def __init__(self, db_path: Path):
         self.db_path = db_path
         self._conn = None
+        self._readers: Optional[asyncio.LifoQueue] = None
+        self._reader_conns: list = []
+        # Serializes statements against an open transaction() on the shared
+        # connection; the context var marks the task that owns it.
+        self._lock = asyncio.Lock()
+        self._in_transaction: ContextVar[bool] = ContextVar(
+            f"sqlite_tx_{id(self)}", default=False
+        )
 
     async def connect(self) -> None:
         import aiosqlite
@@ -89,11 +206,46 @@ class SQLiteBackend(DatabaseBackend):
         # Ensure directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self._conn = await aiosqlite.connect(self.db_path)
+        # Tools reuse a fixed set of SQL strings on this long-lived connection;
+        # size the compiled-statement cache so none of them get re-prepared.
+        # isolation_level=None: autocommit, so single-statement writes need no
+        # separate COMMIT round trip; multi-statement work uses transaction().
+        self._conn = await aiosqlite.connect(
+            self.db_path, cached_statements=256, isolation_level=None
+        )
+        # sqlite3.Row exposes column names without a cursor, which
+        # execute_fetchall() does not return
         self._conn.row_factory = aiosqlite.Row
+        for pragma in self.PRAGMAS:
+            await self._conn.execute(pragma)
 
         # Initialize schema if needed
         await self._init_schema()
+        await self._open_readers()
+
+    async def _open_readers(self) -> None:
+        """Open the read-only connections that serve plain SELECTs.
+
+        Under WAL, readers see the last committed state without waiting on
+        the writer. A LIFO queue hands out the most recently used
+        connection, whose page cache is warmest.
+        """
+        import aiosqlite
+
+        if str(self.db_path) == ":memory:":
+            return
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        self._readers = asyncio.LifoQueue()
+        for _ in range(min(os.cpu_count() or 1, self.MAX_READERS)):
+            # Autocommit, so no implicit BEGIN can pin a reader to an old snapshot
+            conn = await aiosqlite.connect(
+                uri, uri=True, cached_statements=256, isolation_level=None
+            )
+            conn.row_factory = aiosqlite.Row
+            for pragma in self.READER_PRAGMAS:
+                await conn.execute(pragma)
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
 
     async def _init_schema(self) -> None:
         """Initialize database schema if tables don't exist."""
@@ -266,7 +418,6 @@ class SQLiteBackend(DatabaseBackend):
         -- Indexes for common queries
         CREATE INDEX IF NOT EXISTS idx_memories_key ON memories(key);
         CREATE INDEX IF NOT EXISTS idx_memories_type ON memories(memory_type);
-        CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
         CREATE INDEX IF NOT EXISTS idx_entries_agent ON entries(agent);
         CREATE INDEX IF NOT EXISTS idx_kb_category ON knowledge_base(category);
         CREATE INDEX IF NOT EXISTS idx_chat_to_agent ON agent_chat(to_agent);
@@ -275,48 +426,261 @@ class SQLiteBackend(DatabaseBackend):
         CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target_table, target_id);
         CREATE INDEX IF NOT EXISTS idx_topic_entries_topic ON topic_entries(topic_id);
         CREATE INDEX IF NOT EXISTS idx_reference_library_type ON reference_library(source_type);
+
+        -- Composite indexes matching recall_context / search ordering
+        CREATE INDEX IF NOT EXISTS idx_memories_recall
+            ON memories(memory_type, importance DESC, last_accessed DESC, status);
+        CREATE INDEX IF NOT EXISTS idx_entries_recent ON entries(timestamp DESC, title);
+        -- Superseded by idx_entries_recent, which leads with the same column
+        DROP INDEX IF EXISTS idx_entries_timestamp;
+        CREATE INDEX IF NOT EXISTS idx_kb_updated ON knowledge_base(updated_at DESC);
         """
         await self._conn.executescript(schema_sql)
-        await self._conn.commit()
+        await self._init_fts()
+        await self._analyze()
+
+    async def _analyze(self) -> None:
+        """Give the query planner statistics for the indexes above.
+
+        A full ANALYZE runs once, when no statistics exist yet; later opens
+        use PRAGMA optimize, which only re-analyzes tables that need it.
+        """
+        cursor = await self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if await cursor.fetchone() is None:
+            await self._conn.execute("ANALYZE")
+        else:
+            await self._conn.execute("PRAGMA optimize")
+
+    async def _init_fts(self) -> None:
+        """Create trigram FTS5 indexes over the searchable text columns.
+
+        External-content tables kept in sync by triggers. An index is
+        rebuilt when it is first created, or when its triggers were missing
+        (writes went unindexed meanwhile). The trigram tokenizer matches
+        arbitrary substrings case-insensitively, so MATCH stands in for
+        LIKE '%term%' without scanning every row.
+
+        If this SQLite build lacks FTS5 trigram support, searches keep
+        using LIKE and the sync triggers are dropped: they would make every
+        write to the indexed tables fail here. The next open on a build
+        with trigram support recreates them and rebuilds the index.
+        WORKLOG_FTS_CHECK=true also runs FTS5's integrity check on existing
+        indexes and rebuilds any that drifted (a full scan, so opt-in).
+        """
+        if not await self._supports_trigram():
+            await self._drop_fts_triggers()
+            self.supports_fts = False
+            return
+
+        check = is_fts_check_enabled()
+        for table, columns in FTS_COLUMNS.items():
+            fts = f"{table}_fts"
+            cols = ", ".join(columns)
+            new_cols = ", ".join(f"new.{c}" for c in columns)
+            old_cols = ", ".join(f"old.{c}" for c in columns)
+            cursor = await self._conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (?, ?, ?, ?)",
+                (fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au"),
+            )
+            in_sync = (await cursor.fetchone())[0] == 4
+            try:
+                await self._conn.executescript(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    {cols}, content='{table}', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols})
+                        VALUES ('delete', old.id, {old_cols});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols})
+                        VALUES ('delete', old.id, {old_cols});
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+                END;
+                """)
+                if not in_sync or (check and not await self._fts_consistent(fts)):
+                    await self._conn.execute(
+                        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                    )
+            except sqlite3.DatabaseError as e:
+                print(f"WARNING: Full-text index {fts} unavailable, "
+                      f"searches fall back to LIKE: {e}", file=sys.stderr)
+                self.supports_fts = False
+                return
+        self.supports_fts = True
+
+    async def _supports_trigram(self) -> bool:
+        """Probe for the FTS5 trigram tokenizer (SQLite 3.34+ built with FTS5)."""
+        try:
+            await self._conn.executescript(
+                "CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram');"
+                "DROP TABLE temp.fts_probe;"
+            )
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    async def _drop_fts_triggers(self) -> None:
+        for table in FTS_COLUMNS:
+            for suffix in ("ai", "ad", "au"):
+                await self._conn.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+
+    async def _fts_consistent(self, fts: str) -> bool:
+        """Check an external-content FTS index against its content table."""
+        try:
+            await self._conn.execute(
+                f"INSERT INTO {fts}({fts}, rank) VALUES ('integrity-check', 1)"
+            )
+        except sqlite3.DatabaseError:
+            return False
+        return True
 
     async def close(self) -> None:
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        self._readers = None
         if self._conn:
             await self._conn.close()
             self._conn = None
 
+    # Indexes read by recall_context / search ordering; see prewarm()
+    PREWARM_INDEXES = (
+        ("memories", "idx_memories_recall"),
+        ("knowledge_base", "idx_kb_updated"),
+        ("entries", "idx_entries_recent"),
+    )
+
+    async def prewarm(self) -> None:
+        # Index-only counts walk each hot index once, faulting its pages into
+        # the OS page cache / mmap region without touching row data. That
+        # region is shared, so every connection benefits; statements are
+        # compiled per connection and are left to each one's first use.
+        for table, index in self.PREWARM_INDEXES:
+            await self.fetchone(f"SELECT COUNT(*) AS n FROM {table} INDEXED BY {index}")
+
+    @asynccontextmanager
+    async def _statement(self):
+        """Hold the connection lock unless this task owns the open transaction."""
+        if self._in_transaction.get():
+            yield
+        else:
+            async with self._lock:
+                yield
+
+    @asynccontextmanager
+    async def _query_conn(self, query: str):
+        """Pick the connection for a fetch.
+
+        Plain SELECTs outside a transaction go to a read-only connection;
+        anything else (RETURNING writes, reads that must see this task's
+        uncommitted changes) stays on the writer.
+        """
+        if (
+            self._readers is None
+            or self._in_transaction.get()
+            or query.lstrip()[:6].upper() != "SELECT"
+        ):
+            async with self._statement():
+                yield self._conn
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
     async def execute(self, query: str, *args: Any) -> str:
-        cursor = await self._conn.execute(query, args)
-        await self._conn.commit()
+        async with self._statement():
+            cursor = await self._conn.execute(query, args)
         return f"OK {cursor.rowcount}"
 
+    async def executemany(self, query: str, args_seq: Sequence[Sequence[Any]]) -> None:
+        # One transaction (and one fsync) for the whole batch
+        async with self.transaction():
+            await self._conn.executemany(query, args_seq)
+
     async def fetchone(self, query: str, *args: Any) -> Optional[dict]:
-        cursor = await self._conn.execute(query, args)
-        row = await cursor.fetchone()
-        if row:
-            return dict(row)
+        # execute_fetchall runs execute + fetch in a single hop to the
+        # connection thread; callers only use fetchone for single-row queries
+        async with self._query_conn(query) as conn:
+            rows = await conn.execute_fetchall(query, args)
+        if rows:
+            row = rows[0]
+            return dict(zip(row.keys(), row))
         return None
 
     async def fetchall(self, query: str, *args: Any) -> list[dict]:
-        cursor = await self._conn.execute(query, args)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-
-    def placeholder(self, index: int) -> str:
+        async with self._query_conn(query) as conn:
+            rows = await conn.execute_fetchall(query, args)
+        if not rows:
+            return []
+        # Resolve column names once per result instead of once per row
+        columns = rows[0].keys()
+        return [dict(zip(columns, row)) for row in rows]
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Run several statements as one atomic unit.
+
+        Other tasks' statements wait until the transaction ends, so they
+        cannot be swept into (or rolled back with) it.
+        """
+        if self._in_transaction.get():
+            # Nested use joins the outer transaction
+            yield self
+            return
+        async with self._lock:
+            token = self._in_transaction.set(True)
+            try:
+                await self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self
+                except BaseException:
+                    await self._conn.rollback()
+                    raise
+                await self._conn.commit()
+            finally:
+                self._in_transaction.reset(token)
+
+    @staticmethod
+    def placeholder(index: int) -> str:
         return "?"
 
-    def interval_days(self, days: int) -> str:
+    @staticmethod
+    def interval_days(days: int) -> str:
         return f"datetime('now', '-{days} days')"
 
-    def ilike(self, column: str, placeholder: str) -> str:
+    @staticmethod
+    def ilike(column: str, placeholder: str, escape: bool = False) -> str:
         # E1 fix: Use LOWER() for consistent case-insensitive matching
         # SQLite's default LIKE behavior varies with collation settings
-        return f"LOWER({column}) LIKE LOWER({placeholder})"
+        sql = f"LOWER({column}) LIKE LOWER({placeholder})"
+        # SQLite LIKE has no escape character unless one is declared
+        return sql + " ESCAPE '\\'" if escape else sql
 
-    def array_contains(self, column: str, placeholder: str) -> str:
+    @staticmethod
+    def array_contains(column: str, placeholder: str) -> str:
         # SQLite doesn't have array types, so we'll handle this differently
         # The caller needs to expand the array into multiple placeholders
         return f"{column} IN ({placeholder})"
 
+    @staticmethod
+    def fts_match(table: str, placeholder: str) -> str:
+        fts = f"{table}_fts"
+        return f"id IN (SELECT rowid FROM {fts} WHERE {fts} MATCH {placeholder})"
+
+    @staticmethod
+    def fts_query(columns: Sequence[str], term: str) -> str:
+        # Quote as a single phrase so FTS5 operators in user input are literal
+        phrase = '"' + term.replace('"', '""') + '"'
+        return "{" + " ".join(columns) + "} : " + phrase
+
 
 class PostgreSQLBackend(DatabaseBackend):
     """PostgreSQL backend using asyncpg."""
@@ -324,20 +688,33 @@ class PostgreSQLBackend(DatabaseBackend):
     def __init__(self, params: dict):
         self.params = params
         self._pool = None
+        # Connection pinned by this task's open transaction(), if any
+        self._tx_conn: ContextVar[Optional[Any]] = ContextVar(
+            f"worklog_pg_tx_{id(self)}", default=None
+        )
 
     async def connect(self) -> None:
         import asyncpg
 
+        min_size, max_size = get_pool_size()
+        print(
+            f"PostgreSQL pool size: min={min_size}, max={max_size}", file=sys.stderr
+        )
+        # params is either {"dsn": ...} or host/port/database/user/password
         self._pool = await asyncpg.create_pool(
-            host=self.params["host"],
-            port=self.params["port"],
-            database=self.params["database"],
-            user=self.params["user"],
-            password=self.params["password"],
-            min_size=1,
-            max_size=10,
+            **self.params,
+            min_size=min_size,
+            max_size=max_size,
             timeout=30,  # Connection timeout in seconds
             command_timeout=60,  # Query timeout in seconds
+            # Tools issue a small, fixed set of statement shapes; keep them all
+            # prepared per connection instead of re-parsing on cache eviction.
+            # fetch/fetchrow/execute look statements up in this cache by SQL
+            # text, so repeated queries skip Parse and go straight to Bind.
+            # Zero behind PgBouncer (WORKLOG_PGBOUNCER).
+            statement_cache_size=get_statement_cache_size(),
+            max_cached_statement_lifetime=0,  # Never expire cached statements
+            max_inactive_connection_lifetime=300,  # Drop idle extras after 5 min
         )
 
     async def close(self) -> None:
@@ -345,47 +722,97 @@ class PostgreSQLBackend(DatabaseBackend):
             await self._pool.close()
             self._pool = None
 
-    async def execute(self, query: str, *args: Any) -> str:
-        # P2 fix: Add timeout to prevent indefinite wait on pool exhaustion
+    @asynccontextmanager
+    async def _acquire(self):
+        """Check out a pool connection, failing fast if the pool is exhausted.
+
+        P2 fix: bounded wait instead of blocking indefinitely. The timeout
+        covers only the checkout; query time is governed by command_timeout.
+        Inside transaction() the pinned connection is reused instead.
+        """
+        if (conn := self._tx_conn.get()) is not None:
+            yield conn
+            return
         try:
-            async with asyncio.timeout(5):  # 5 second timeout to acquire connection
-                async with self._pool.acquire() as conn:
-                    return await conn.execute(query, *args)
+            conn = await self._pool.acquire(timeout=5)
         except asyncio.TimeoutError:
             raise DatabaseError("Database connection pool exhausted, please retry")
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    async def execute(self, query: str, *args: Any) -> str:
+        async with self._acquire() as conn:
+            return await conn.execute(query, *args)
+
+    async def executemany(self, query: str, args_seq: Sequence[Sequence[Any]]) -> None:
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(query, args_seq)
 
     async def fetchone(self, query: str, *args: Any) -> Optional[dict]:
-        try:
-            async with asyncio.timeout(5):
-                async with self._pool.acquire() as conn:
-                    row = await conn.fetchrow(query, *args)
-                    if row:
-                        return dict(row)
-                    return None
-        except asyncio.TimeoutError:
-            raise DatabaseError("Database connection pool exhausted, please retry")
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(query, *args)
+        if row:
+            return dict(row)
+        return None
 
     async def fetchall(self, query: str, *args: Any) -> list[dict]:
-        try:
-            async with asyncio.timeout(5):
-                async with self._pool.acquire() as conn:
-                    rows = await conn.fetch(query, *args)
-                    return [dict(row) for row in rows]
-        except asyncio.TimeoutError:
-            raise DatabaseError("Database connection pool exhausted, please retry")
+        async with self._acquire() as conn:
+            rows = await conn.fetch(query, *args)
+        if not rows:
+            return []
+        # All records share one shape; read the keys once
+        columns = tuple(rows[0].keys())
+        return [dict(zip(columns, row.values())) for row in rows]
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Run several statements as one atomic unit on a single connection."""
+        if self._tx_conn.get() is not None:
+            # Nested use joins the outer transaction
+            yield self
+            return
+        async with self._acquire() as conn:
+            token = self._tx_conn.set(conn)
+            try:
+                async with conn.transaction():
+                    yield self
+            finally:
+                self._tx_conn.reset(token)
 
-    def placeholder(self, index: int) -> str:
+    @staticmethod
+    def placeholder(index: int) -> str:
         return f"${index}"
 
-    def interval_days(self, days: int) -> str:
+    @staticmethod
+    def interval_days(days: int) -> str:
         return f"NOW() - INTERVAL '{days} days'"
 
-    def ilike(self, column: str, placeholder: str) -> str:
+    @staticmethod
+    def ilike(column: str, placeholder: str, escape: bool = False) -> str:
+        # Backslash is already PostgreSQL's default LIKE escape
         return f"{column} ILIKE {placeholder}"
 
-    def array_contains(self, column: str, placeholder: str) -> str:
+    @staticmethod
+    def array_contains(column: str, placeholder: str) -> str:
         return f"{column} = ANY({placeholder}::text[])"
 
+    @staticmethod
+    def fts_match(table: str, placeholder: str) -> str:
+        # No full-text index here (supports_fts is False): match the indexed
+        # columns with ILIKE, which the optional pg_trgm indexes accelerate
+        columns = " OR ".join(
+            PostgreSQLBackend.ilike(c, placeholder) for c in FTS_COLUMNS[table]
+        )
+        return f"({columns})"
+
+    @staticmethod
+    def fts_query(columns: Sequence[str], term: str) -> str:
+        # fts_match searches all of FTS_COLUMNS[table]; columns is a subset
+        return f"%{term.translate(_LIKE_ESCAPES)}%"
+
 
 # Global database instance with lock for thread-safe initialization
 _db: Optional[DatabaseBackend] = None
@@ -414,17 +841,17 @@ async def get_db() -> DatabaseBackend:
 
         if backend == Backend.SQLITE:
             db_path = get_sqlite_path()
-            _db = SQLiteBackend(db_path)
+            db = SQLiteBackend(db_path)
         else:
             try:
                 params = get_postgresql_params()
-                _db = PostgreSQLBackend(params)
+                db = PostgreSQLBackend(params)
             except ValueError as e:
                 # Only fall back to SQLite if explicitly allowed
                 allow_fallback = os.environ.get("WORKLOG_ALLOW_FALLBACK", "").lower() in ("1", "true", "yes")
                 if allow_fallback:
                     print(f"WARNING: PostgreSQL not configured, falling back to SQLite: {e}", file=sys.stderr)
-                    _db = SQLiteBackend(get_sqlite_path())
+                    db = SQLiteBackend(get_sqlite_path())
                 else:
                     raise ValueError(
                         f"PostgreSQL configuration error: {e}\n"
@@ -432,7 +859,11 @@ async def get_db() -> DatabaseBackend:
                         "or fix PostgreSQL configuration."
                     )
 
-        await _db.connect()
+        # Publish only after connect() succeeds: the lock-free fast path above
+        # must never hand out a half-initialized backend, and a failed connect
+        # must leave _db unset so the next call retries.
+        await db.connect()
+        _db = db
 
     return _db
 
@@ -451,8 +882,7 @@ async def close_db() -> None:
 
 def get_unique_violation_error():
     """Get the appropriate unique violation error class for the current backend."""
-    backend = get_backend()
-    if backend == Backend.POSTGRESQL:
+    if is_postgresql():
         try:
             import asyncpg
             return asyncpg.UniqueViolationError
@@ -461,3 +891,14 @@ def get_unique_violation_error():
     # SQLite or fallback
     import sqlite3
     return sqlite3.IntegrityError
+
+
+def is_unique_violation(exc: BaseException) -> bool:
+    """Check whether exc is a unique-constraint violation from the active backend.
+
+    sqlite3 reports NOT NULL, CHECK, foreign key and trigger aborts with the
+    same IntegrityError class, so SQLite also needs the message prefix.
+    """
+    if not isinstance(exc, get_unique_violation_error()):
+        return False
+    return is_postgresql() or str(exc).startswith("UNIQUE constraint failed")
@@ -8,18 +8,29 @@ Backend selection:
 - PostgreSQL: Set DATABASE_URL or PGHOST environment variables
 """
 
-import json
+import asyncio
+import os
 import re
+import sys
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+
+import orjson
 from fastmcp import FastMCP
 
 from worklog_mcp.config import (
     get_backend,
+    is_postgresql,
     is_read_only,
     Backend,
     TABLES,
+    AGENTS,
+    AGENT_NAMES,
+    CHAT_PRIORITIES,
     MEMORY_TYPES,
     MEMORY_STATUSES,
     TASK_TYPES,
@@ -27,6 +38,13 @@ from worklog_mcp.config import (
     RELATIONSHIP_TYPES,
     ENTRY_TABLES,
     CURATION_OPERATIONS,
+    VALID_CHAT_PRIORITIES,
+    VALID_MEMORY_TYPES,
+    VALID_MEMORY_STATUSES,
+    VALID_TASK_TYPES,
+    VALID_KB_CATEGORIES,
+    VALID_RELATIONSHIP_TYPES,
+    VALID_ENTRY_TABLES,
 )
 
 
@@ -35,7 +53,9 @@ READ_ONLY_ERROR = {
     "error": "Read-only mode enabled. Write operations are disabled.",
     "hint": "Set WORKLOG_READ_ONLY=false to enable writes."
 }
-from worklog_mcp.database import get_db, close_db, UniqueViolationError
+from worklog_mcp.database import (
+    get_db, close_db, is_unique_violation, FTS_MIN_TERM_LENGTH, DatabaseBackend,
+)
 
 
 # Column whitelist per table - prevents SQL injection via column names
@@ -107,10 +127,21 @@ TABLE_COLUMNS: dict[str, frozenset[str]] = {
 # Valid table names (immutable for security)
 VALID_TABLES: frozenset[str] = frozenset(TABLE_COLUMNS.keys())
 
+# Sorted column lists for validation error messages
+_ALLOWED_SORTED: dict[str, list[str]] = {
+    table: sorted(columns) for table, columns in TABLE_COLUMNS.items()
+}
+
 # Input length limits
 MAX_SEARCH_QUERY_LENGTH = 500
 MAX_FILTER_VALUE_LENGTH = 1000
 MAX_COLUMN_SPEC_LENGTH = 500
+MAX_BULK_ITEMS = 100
+
+
+# Backslash-escape table for LIKE patterns (used with ESCAPE '\')
+_LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+_LIKE_SPECIAL = frozenset("\\%_")
 
 
 def _escape_search_wildcards(term: str) -> str:
@@ -122,16 +153,18 @@ def _escape_search_wildcards(term: str) -> str:
     Returns:
         Escaped term safe for LIKE queries
     """
-    # Escape backslash first, then wildcards
-    term = term.replace("\\", "\\\\")
-    term = term.replace("%", "\\%")
-    term = term.replace("_", "\\_")
-    return f"%{term}%"
+    # Most terms contain nothing to escape; skip the translate pass then
+    if not _LIKE_SPECIAL.intersection(term):
+        return f"%{term}%"
+    return f"%{term.translate(_LIKE_ESCAPES)}%"
 
 
+@lru_cache(maxsize=256)
 def _validate_columns(columns: str, table: str) -> tuple[bool, str]:
     """Validate column names against whitelist.
 
+    Results are memoized: clients tend to repeat the same column lists.
+
     Args:
         columns: Comma-separated column names or "*"
         table: Table name to validate against
@@ -142,16 +175,27 @@ def _validate_columns(columns: str, table: str) -> tuple[bool, str]:
     if columns.strip() == "*":
         return True, "*"
 
-    allowed = TABLE_COLUMNS.get(table, set())
+    allowed = TABLE_COLUMNS.get(table, frozenset())
     requested = [c.strip().lower() for c in columns.split(",")]
 
-    invalid = [c for c in requested if c not in allowed]
-    if invalid:
-        return False, f"Invalid columns: {invalid}. Allowed: {sorted(allowed)}"
+    if not allowed.issuperset(requested):
+        invalid = [c for c in requested if c not in allowed]
+        allowed_sorted = _ALLOWED_SORTED.get(table, [])
+        return False, f"Invalid columns: {invalid}. Allowed: {allowed_sorted}"
 
     return True, ", ".join(requested)
 
 
+# (table, normalized order_by) -> ORDER BY clause, for every whitelisted
+# column with and without an explicit direction
+_ORDER_BY_SQL: dict[tuple[str, str], str] = {
+    (table, f"{column}{suffix}"): f"{column} {direction}"
+    for table, allowed in TABLE_COLUMNS.items()
+    for column in allowed
+    for suffix, direction in (("", "ASC"), (" asc", "ASC"), (" desc", "DESC"))
+}
+
+
 def _validate_order_by(order_by: str, table: str) -> tuple[bool, str]:
     """Validate ORDER BY clause against whitelist.
 
@@ -165,6 +209,11 @@ def _validate_order_by(order_by: str, table: str) -> tuple[bool, str]:
     if not order_by:
         return True, ""
 
+    # Fast path: every legal clause is precomputed
+    safe = _ORDER_BY_SQL.get((table, " ".join(order_by.lower().split())))
+    if safe:
+        return True, safe
+
     # Parse "column_name DESC" or "column_name ASC" or just "column_name"
     parts = order_by.strip().split()
     if len(parts) > 2:
@@ -178,16 +227,46 @@ def _validate_order_by(order_by: str, table: str) -> tuple[bool, str]:
 
     allowed = TABLE_COLUMNS.get(table, set())
     if column not in allowed:
-        return False, f"Invalid order_by column: {column}. Allowed: {sorted(allowed)}"
+        allowed_sorted = _ALLOWED_SORTED.get(table, [])
+        return False, f"Invalid order_by column: {column}. Allowed: {allowed_sorted}"
 
     return True, f"{column} {direction}"
 
 
 @asynccontextmanager
 async def lifespan(app):
-    """Lifespan context manager for connection pool cleanup."""
-    yield
-    await close_db()
+    """Lifespan context manager for connection pool setup and cleanup.
+
+    The backend is initialized eagerly so the first tool call does not pay
+    connection/pool startup cost, and misconfiguration surfaces at startup.
+    prewarm() then touches the hot indexes once; prepared statements are
+    per connection and not warmed here.
+    """
+    db = await get_db()
+    await db.prewarm()
+    flusher = asyncio.create_task(_access_flush_loop())
+    try:
+        yield
+    finally:
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        if _access_flush_task is not None:
+            await _access_flush_task
+        await _try_flush_access_counts()
+        await close_db()
+
+
+def _serialize_result(data) -> str:
+    """Serialize tool results with orjson.
+
+    Rows can carry datetimes/Decimals (PostgreSQL) and integer-keyed dicts;
+    anything orjson cannot encode natively falls back to str(). FastMCP falls
+    back to its default serializer if this raises.
+    """
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 mcp = FastMCP(
@@ -197,6 +276,7 @@ mcp = FastMCP(
     "recall_context at task start to load relevant context, store_memory for facts, "
     "and log_entry for work tracking. Supports SQLite (default) and PostgreSQL.",
     lifespan=lifespan,
+    tool_serializer=_serialize_result,
 )
 
 
@@ -213,6 +293,57 @@ def _build_placeholders(count: int, backend: Backend) -> list[str]:
 # =============================================================================
 
 
+# Window-count column added to query_table's page query (stripped from rows)
+_TOTAL_COLUMN = "_worklog_total"
+
+# Operators accepted by query_table's filter_op
+FILTER_OPS: frozenset[str] = frozenset(
+    {"=", "!=", ">", "<", ">=", "<=", "LIKE", "ILIKE"}
+)
+
+
+@lru_cache(maxsize=None)
+def _filter_clause(dialect: type[DatabaseBackend], column: str, op: str) -> str:
+    """Build the WHERE clause for a validated (column, operator) filter shape.
+
+    The value is always bound as the first parameter, so every filter with
+    the same shape produces identical SQL and reuses the cached statement.
+    """
+    p1 = dialect.placeholder(1)
+    if op == "ILIKE":
+        return dialect.ilike(column, p1)
+    return f"{column} {op} {p1}"
+
+
+@lru_cache(maxsize=512)
+def _query_table_sql(
+    dialect: type[DatabaseBackend],
+    table: str,
+    columns: str,
+    where: str,
+    order_by: str,
+    include_total: bool = True,
+) -> tuple[str, str]:
+    """Build query_table's (page, count) SQL for one validated query shape.
+
+    LIMIT and OFFSET are bound after the optional filter value rather than
+    inlined, so paging through a shape keeps hitting the statement cache.
+    With include_total, the window count returns the total number of
+    matching rows alongside the page in a single scan.
+    """
+    total = f", COUNT(*) OVER() AS {_TOTAL_COLUMN}" if include_total else ""
+    query = f"SELECT {columns}{total} FROM {table}"
+    count_query = f"SELECT COUNT(*) as total FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+        count_query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    n = 2 if where else 1
+    query += f" LIMIT {dialect.placeholder(n)} OFFSET {dialect.placeholder(n + 1)}"
+    return query, count_query
+
+
 @mcp.tool()
 async def query_table(
     table: str,
@@ -223,6 +354,7 @@ async def query_table(
     order_by: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
+    include_total: bool = False,
 ) -> dict:
     """Query any table in the worklog database with filtering and pagination.
 
@@ -235,9 +367,11 @@ async def query_table(
         order_by: Column to order by with direction, e.g. "created_at DESC"
         limit: Maximum rows to return (default 20, max 100)
         offset: Number of rows to skip for pagination (must be >= 0)
+        include_total: Also count all matching rows (default False)
 
     Returns:
-        dict with 'rows' list and 'count' of total matching rows
+        dict with 'rows' list, 'count' of rows returned, and 'total' matching
+        rows (None unless include_total)
     """
     # Validate table name against immutable whitelist
     if table not in VALID_TABLES:
@@ -268,47 +402,41 @@ async def query_table(
     safe_order_by = result
 
     # Validate filter_column if provided
-    allowed_ops = frozenset({"=", "!=", ">", "<", ">=", "<=", "LIKE", "ILIKE"})
     if filter_column:
         allowed = TABLE_COLUMNS.get(table, frozenset())
         if filter_column.lower() not in allowed:
             return {"error": "Invalid filter column"}
-        if filter_op.upper() not in allowed_ops:
+        if filter_op.upper() not in FILTER_OPS:
             return {"error": "Invalid filter operator"}
 
     db = await get_db()
-    backend = get_backend()
 
-    # Build parameterized query
-    query = f"SELECT {safe_columns} FROM {table}"
-    count_query = f"SELECT COUNT(*) as total FROM {table}"
     params = []
-
+    where_clause = ""
     if filter_column and filter_value is not None:
-        p1 = db.placeholder(1)
-        op = filter_op.upper()
-        col = filter_column.lower()
-
-        if op == "ILIKE":
-            where_clause = db.ilike(col, p1)
-        else:
-            where_clause = f"{col} {op} {p1}"
-
-        query += f" WHERE {where_clause}"
-        count_query += f" WHERE {where_clause}"
+        where_clause = _filter_clause(
+            type(db), filter_column.lower(), filter_op.upper()
+        )
         params.append(filter_value)
 
-    if safe_order_by:
-        query += f" ORDER BY {safe_order_by}"
-
-    query += f" LIMIT {limit} OFFSET {offset}"
-
-    # Get total count
-    count_row = await db.fetchone(count_query, *params) if params else await db.fetchone(count_query)
-    total = count_row["total"] if count_row else 0
+    query, count_query = _query_table_sql(
+        type(db), table, safe_columns, where_clause, safe_order_by, include_total
+    )
 
-    # Get rows
-    rows = await db.fetchall(query, *params) if params else await db.fetchall(query)
+    rows = await db.fetchall(query, *params, limit, offset)
+    if not include_total:
+        total = None
+    elif rows:
+        total = rows[0][_TOTAL_COLUMN]
+        for row in rows:
+            del row[_TOTAL_COLUMN]
+    elif offset or not limit:
+        # Paged past the end (or asked for no rows): no row carried the
+        # total, count separately
+        count_row = await db.fetchone(count_query, *params)
+        total = count_row["total"] if count_row else 0
+    else:
+        total = 0
 
     return {
         "rows": rows,
@@ -319,6 +447,86 @@ async def query_table(
     }
 
 
+# Per-table search shape: (select columns, LIKE columns, ORDER BY)
+_SEARCH_SPECS = {
+    "memories": (
+        "id, key, summary, memory_type, importance, tags, created_at",
+        ("content", "summary", "key", "tags"),
+        "importance DESC, created_at DESC",
+    ),
+    "knowledge_base": (
+        "id, category, title, tags, created_at, updated_at",
+        ("title", "content", "tags", "category"),
+        "updated_at DESC",
+    ),
+    "entries": (
+        "id, timestamp, agent, task_type, title, outcome, tags",
+        ("title", "details", "outcome", "tags"),
+        "timestamp DESC",
+    ),
+    "research": (
+        "id, source_type, title, summary, relevance_score, tags, status",
+        ("title", "summary", "key_points", "tags"),
+        "relevance_score DESC, created_at DESC",
+    ),
+}
+
+
+def _use_fts(db, term: str) -> bool:
+    """Whether a text search for term can use the backend's full-text index."""
+    return db.supports_fts and len(term) >= FTS_MIN_TERM_LENGTH
+
+
+# Default search_knowledge targets, in a stable order
+_SEARCHABLE_TABLES: tuple[str, ...] = tuple(_SEARCH_SPECS)
+
+
+@lru_cache(maxsize=None)
+def _search_sql(
+    dialect: type[DatabaseBackend], table: str, fts: bool = False
+) -> Optional[str]:
+    """Build the search_knowledge SQL for a table once per backend class.
+
+    Reusing the identical SQL text lets SQLite's statement cache and
+    asyncpg's prepared-statement cache skip re-parsing on every search.
+    With fts, $1 is a full-text query (db.fts_query) instead of a LIKE pattern.
+    """
+    spec = _SEARCH_SPECS.get(table)
+    if spec is None:
+        return None
+    columns, like_columns, order_by = spec
+    p1, p2 = dialect.placeholder(1), dialect.placeholder(2)
+    if fts:
+        where = dialect.fts_match(table, p1)
+    else:
+        where = " OR ".join(
+            dialect.ilike(col, p1, escape=True) for col in like_columns
+        )
+    return f"""
+                SELECT {columns}
+                FROM {table}
+                WHERE {where}
+                ORDER BY {order_by}
+                LIMIT {p2}
+            """
+
+
+async def _search_one(
+    db, table: str, query: str, search_term: str, limit: int, use_fts: bool
+) -> list[dict]:
+    """Run search_knowledge's query against a single table."""
+    sql = _search_sql(type(db), table, use_fts)
+    if use_fts:
+        match = db.fts_query(_SEARCH_SPECS[table][1], query)
+        return await db.fetchall(sql, match, limit)
+    # SQLite uses positional placeholders, so we need to pass search_term 4 times
+    # (once for each LIKE clause) plus limit
+    if not is_postgresql():
+        return await db.fetchall(sql, *[search_term] * 4, limit)
+    # PostgreSQL can reuse $1 placeholder
+    return await db.fetchall(sql, search_term, limit)
+
+
 @mcp.tool()
 async def search_knowledge(
     query: str,
@@ -344,81 +552,29 @@ async def search_knowledge(
     # Validate and bound limit
     limit = min(max(limit, 1), 100)
 
-    search_tables = tables.split(",") if tables else list(VALID_TABLES)
-    search_tables = [t.strip() for t in search_tables if t.strip() in VALID_TABLES]
+    if tables:
+        requested = (t.strip() for t in tables.split(","))
+        search_tables = [t for t in requested if t in VALID_TABLES]
+    else:
+        search_tables = list(_SEARCHABLE_TABLES)
 
     if not search_tables:
         return {"error": "No valid tables specified"}
 
-    results = {}
     # E2 fix: Escape SQL wildcards to prevent wildcard injection
     search_term = _escape_search_wildcards(query)
     db = await get_db()
-    backend = get_backend()
 
-    for table in search_tables:
-        p1 = db.placeholder(1)
-        p2 = db.placeholder(2)
-
-        if table == "memories":
-            like1 = db.ilike("content", p1)
-            like2 = db.ilike("summary", p1)
-            like3 = db.ilike("key", p1)
-            like4 = db.ilike("tags", p1)
-            sql = f"""
-                SELECT id, key, summary, memory_type, importance, tags, created_at
-                FROM memories
-                WHERE {like1} OR {like2} OR {like3} OR {like4}
-                ORDER BY importance DESC, created_at DESC
-                LIMIT {p2}
-            """
-        elif table == "knowledge_base":
-            like1 = db.ilike("title", p1)
-            like2 = db.ilike("content", p1)
-            like3 = db.ilike("tags", p1)
-            like4 = db.ilike("category", p1)
-            sql = f"""
-                SELECT id, category, title, tags, created_at, updated_at
-                FROM knowledge_base
-                WHERE {like1} OR {like2} OR {like3} OR {like4}
-                ORDER BY updated_at DESC
-                LIMIT {p2}
-            """
-        elif table == "entries":
-            like1 = db.ilike("title", p1)
-            like2 = db.ilike("details", p1)
-            like3 = db.ilike("outcome", p1)
-            like4 = db.ilike("tags", p1)
-            sql = f"""
-                SELECT id, timestamp, agent, task_type, title, outcome, tags
-                FROM entries
-                WHERE {like1} OR {like2} OR {like3} OR {like4}
-                ORDER BY timestamp DESC
-                LIMIT {p2}
-            """
-        elif table == "research":
-            like1 = db.ilike("title", p1)
-            like2 = db.ilike("summary", p1)
-            like3 = db.ilike("key_points", p1)
-            like4 = db.ilike("tags", p1)
-            sql = f"""
-                SELECT id, source_type, title, summary, relevance_score, tags, status
-                FROM research
-                WHERE {like1} OR {like2} OR {like3} OR {like4}
-                ORDER BY relevance_score DESC, created_at DESC
-                LIMIT {p2}
-            """
-        else:
-            continue
+    use_fts = _use_fts(db, query)
 
-        # SQLite uses positional placeholders, so we need to pass search_term 4 times
-        # (once for each LIKE clause) plus limit
-        if backend == Backend.SQLITE:
-            rows = await db.fetchall(sql, search_term, search_term, search_term, search_term, limit)
-        else:
-            # PostgreSQL can reuse $1 placeholder
-            rows = await db.fetchall(sql, search_term, limit)
-        results[table] = rows
+    # Tables are independent: run their searches concurrently so PostgreSQL
+    # can use several pool connections (SQLite serializes on its connection)
+    searchable = [t for t in search_tables if t in _SEARCH_SPECS]
+    table_rows = await asyncio.gather(*(
+        _search_one(db, table, query, search_term, limit, use_fts)
+        for table in searchable
+    ))
+    results = dict(zip(searchable, table_rows))
 
     return {
         "query": query,
@@ -427,6 +583,150 @@ async def search_knowledge(
     }
 
 
+# recall_context result columns per bucket
+_RECALL_MEMORY_COLUMNS = (
+    "id", "key", "content", "summary", "memory_type", "importance", "tags",
+    "created_at",
+)
+_RECALL_KNOWLEDGE_COLUMNS = ("id", "category", "title", "content", "tags", "updated_at")
+_RECALL_RECENT_COLUMNS = (
+    "id", "timestamp", "agent", "task_type", "title", "outcome", "tags",
+)
+
+# Shared column layout of recall_context's UNION ALL. Branches fill columns
+# their table lacks with typed NULLs so PostgreSQL can unify the types.
+_RECALL_UNION_COLUMNS = (
+    ("id", "INTEGER"), ("key", "TEXT"), ("title", "TEXT"), ("content", "TEXT"),
+    ("summary", "TEXT"), ("memory_type", "TEXT"), ("importance", "INTEGER"),
+    ("category", "TEXT"), ("agent", "TEXT"), ("task_type", "TEXT"),
+    ("outcome", "TEXT"), ("tags", "TEXT"), ("created_at", "TIMESTAMP"),
+    ("updated_at", "TIMESTAMP"), ("timestamp", "TIMESTAMP"),
+)
+
+
+def _recall_branch(
+    kind: str,
+    table: str,
+    columns: tuple[str, ...],
+    where: str,
+    order_by: str,
+    limit: str,
+) -> str:
+    """One ordered, limited SELECT of recall_context's UNION ALL.
+
+    rn records the row's position within its branch, since UNION ALL does
+    not guarantee the branches' ORDER BY survives.
+    """
+    select = ", ".join(
+        name if name in columns else f"CAST(NULL AS {sql_type}) AS {name}"
+        for name, sql_type in _RECALL_UNION_COLUMNS
+    )
+    return f"""
+        SELECT * FROM (
+            SELECT '{kind}' AS kind,
+                   ROW_NUMBER() OVER (ORDER BY {order_by}) AS rn,
+                   {select}
+            FROM {table}
+            WHERE {where}
+            ORDER BY {order_by}
+            LIMIT {limit}
+        ) AS recall_{kind}"""
+
+
+# recall_context results keyed by the normalized arguments plus the write
+# generation; entries expire after RECALL_CACHE_TTL seconds so writes made
+# by other processes sharing the database show up without a restart.
+RECALL_CACHE_SIZE = 256
+RECALL_CACHE_TTL = 60.0
+_recall_cache: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+_write_generation = 0
+
+
+def _copy_recall(results: dict) -> dict:
+    """Copy a recall_context result so callers cannot modify the cached one."""
+    return {
+        key: [dict(row) for row in value] if isinstance(value, list) else value
+        for key, value in results.items()
+    }
+
+
+def _note_write() -> None:
+    """Invalidate cached reads after a write to memories, knowledge or entries."""
+    global _write_generation
+    _write_generation += 1
+
+
+# Columns each recall_context branch matches the topic against
+_RECALL_TEXT_COLUMNS = {
+    "memories": ("content", "summary", "key", "tags"),
+    "knowledge_base": ("title", "content", "tags"),
+    "entries": ("title", "tags"),
+}
+
+
+@lru_cache(maxsize=None)
+def _recall_sql(
+    dialect: type[DatabaseBackend], type_count: int, use_fts: bool, include_recent: bool
+) -> str:
+    """Build recall_context's UNION ALL once per query shape.
+
+    All three lookups go out as one statement; each branch keeps its own
+    filter, ordering and limit, and rows are split back by "kind". The
+    placeholders are numbered in the order recall_context binds arguments.
+    """
+    count = 0
+
+    def bind() -> str:
+        nonlocal count
+        count += 1
+        return dialect.placeholder(count)
+
+    def text_match(table: str) -> str:
+        if use_fts:
+            return dialect.fts_match(table, bind())
+        columns = _RECALL_TEXT_COLUMNS[table]
+        likes = (dialect.ilike(col, bind(), escape=True) for col in columns)
+        return "(" + " OR ".join(likes) + ")"
+
+    if is_postgresql():
+        # PostgreSQL: Use ANY for array
+        type_match = dialect.array_contains("memory_type", bind())
+    else:
+        # SQLite: Use IN clause with expanded values
+        type_match = f"memory_type IN ({', '.join(bind() for _ in range(type_count))})"
+
+    # Relevant memories
+    branches = [_recall_branch(
+        "memories", "memories", _RECALL_MEMORY_COLUMNS,
+        f"""{type_match}
+              AND importance >= {bind()}
+              AND status != 'archived'
+              AND {text_match("memories")}""",
+        "importance DESC, last_accessed DESC",
+        bind(),
+    )]
+
+    # Relevant knowledge base entries
+    branches.append(_recall_branch(
+        "knowledge", "knowledge_base", _RECALL_KNOWLEDGE_COLUMNS,
+        text_match("knowledge_base"),
+        "updated_at DESC",
+        bind(),
+    ))
+
+    # Recent work entries, if requested
+    if include_recent:
+        branches.append(_recall_branch(
+            "recent_work", "entries", _RECALL_RECENT_COLUMNS,
+            f"""timestamp > {dialect.interval_days(7)}
+              AND {text_match("entries")}""",
+            "timestamp DESC",
+            bind(),
+        ))
+
+    return "\nUNION ALL\n".join(branches)
+
+
 @mcp.tool()
 async def recall_context(
     topic: str,
@@ -459,7 +759,16 @@ async def recall_context(
     min_importance = min(max(min_importance, 1), 10)
 
     types = memory_types.split(",") if memory_types else ["fact", "context"]
-    types = [t.strip() for t in types if t.strip() in MEMORY_TYPES]
+    types = [t.strip() for t in types if t.strip() in VALID_MEMORY_TYPES]
+
+    cache_key = (
+        _write_generation, topic, tuple(types), min_importance, include_recent, limit
+    )
+    cached = _recall_cache.get(cache_key)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        _recall_cache.move_to_end(cache_key)
+        return _copy_recall(cached[1])
 
     # E2 fix: Escape SQL wildcards
     search_term = _escape_search_wildcards(topic)
@@ -471,83 +780,38 @@ async def recall_context(
     }
 
     db = await get_db()
-    backend = get_backend()
-
-    # Get relevant memories
-    p1, p2, p3, p4 = [db.placeholder(i) for i in range(1, 5)]
-
-    if backend == Backend.SQLITE:
-        # SQLite: Use IN clause with expanded values
-        type_placeholders = ", ".join(["?" for _ in types])
-        like1 = db.ilike("content", "?")
-        like2 = db.ilike("summary", "?")
-        like3 = db.ilike("key", "?")
-        like4 = db.ilike("tags", "?")
-        memory_sql = f"""
-            SELECT id, key, content, summary, memory_type, importance, tags, created_at
-            FROM memories
-            WHERE memory_type IN ({type_placeholders})
-              AND importance >= ?
-              AND status != 'archived'
-              AND ({like1} OR {like2} OR {like3} OR {like4})
-            ORDER BY importance DESC, last_accessed DESC
-            LIMIT ?
-        """
-        # Args: types..., min_importance, search_term x4, limit
-        args = (*types, min_importance, search_term, search_term, search_term, search_term, limit)
-        rows = await db.fetchall(memory_sql, *args)
-    else:
-        # PostgreSQL: Use ANY for array
-        like1 = db.ilike("content", "$3")
-        like2 = db.ilike("summary", "$3")
-        like3 = db.ilike("key", "$3")
-        like4 = db.ilike("tags", "$3")
-        memory_sql = f"""
-            SELECT id, key, content, summary, memory_type, importance, tags, created_at
-            FROM memories
-            WHERE memory_type = ANY($1::text[])
-              AND importance >= $2
-              AND status != 'archived'
-              AND ({like1} OR {like2} OR {like3} OR {like4})
-            ORDER BY importance DESC, last_accessed DESC
-            LIMIT $4
-        """
-        rows = await db.fetchall(memory_sql, types, min_importance, search_term, limit)
-
-    results["memories"] = rows
-
-    # Get relevant knowledge base entries
-    p1, p2 = db.placeholder(1), db.placeholder(2)
-    like1 = db.ilike("title", p1)
-    like2 = db.ilike("content", p1)
-    like3 = db.ilike("tags", p1)
-    kb_sql = f"""
-        SELECT id, category, title, content, tags, updated_at
-        FROM knowledge_base
-        WHERE {like1} OR {like2} OR {like3}
-        ORDER BY updated_at DESC
-        LIMIT {p2}
-    """
-    rows = await db.fetchall(kb_sql, search_term, limit // 2)
-    results["knowledge"] = rows
-
-    # Get recent work entries if requested
+    use_fts = _use_fts(db, topic)
+
+    def text_args(table: str) -> list:
+        columns = _RECALL_TEXT_COLUMNS[table]
+        if use_fts:
+            return [db.fts_query(columns, topic)]
+        return [search_term] * len(columns)
+
+    # Arguments in the placeholder order laid out by _recall_sql()
+    args: list = [types] if is_postgresql() else list(types)
+    args += [min_importance, *text_args("memories"), limit]
+    args += [*text_args("knowledge_base"), limit // 2]
     if include_recent:
-        interval = db.interval_days(7)
-        like1 = db.ilike("title", p1)
-        like2 = db.ilike("tags", p1)
-        recent_sql = f"""
-            SELECT id, timestamp, agent, task_type, title, outcome, tags
-            FROM entries
-            WHERE timestamp > {interval}
-              AND ({like1} OR {like2})
-            ORDER BY timestamp DESC
-            LIMIT {p2}
-        """
-        rows = await db.fetchall(recent_sql, search_term, limit // 2)
-        results["recent_work"] = rows
+        args += [*text_args("entries"), limit // 2]
+
+    sql = _recall_sql(type(db), len(types), use_fts, include_recent)
+    rows = await db.fetchall(sql, *args)
+    rows.sort(key=lambda row: row["rn"])
+    bucket_columns = {
+        "memories": _RECALL_MEMORY_COLUMNS,
+        "knowledge": _RECALL_KNOWLEDGE_COLUMNS,
+        "recent_work": _RECALL_RECENT_COLUMNS,
+    }
+    for row in rows:
+        kind = row["kind"]
+        results[kind].append({col: row[col] for col in bucket_columns[kind]})
 
-    return results
+    _recall_cache[cache_key] = (now + RECALL_CACHE_TTL, results)
+    _recall_cache.move_to_end(cache_key)
+    if len(_recall_cache) > RECALL_CACHE_SIZE:
+        _recall_cache.popitem(last=False)
+    return _copy_recall(results)
 
 
 @mcp.tool()
@@ -568,6 +832,81 @@ async def get_knowledge_entry(id: int) -> dict:
     return {"error": f"No knowledge base entry with id {id}"}
 
 
+# get_memory access counts not yet written, by memory key. Flushed every
+# ACCESS_FLUSH_INTERVAL seconds by the lifespan task, on shutdown, or in the
+# background once ACCESS_FLUSH_MAX_KEYS keys are pending. While flushes fail
+# the loop backs off up to ACCESS_FLUSH_MAX_INTERVAL, and keys beyond
+# ACCESS_PENDING_MAX_KEYS are dropped rather than buffered.
+_access_counts: dict[str, int] = {}
+ACCESS_FLUSH_INTERVAL = 0.5
+ACCESS_FLUSH_MAX_INTERVAL = 30.0
+ACCESS_FLUSH_MAX_KEYS = 100
+ACCESS_PENDING_MAX_KEYS = 10_000
+_access_flush_task: Optional[asyncio.Task] = None
+_access_flush_failing = False
+
+
+def _record_access(key: str, count: int) -> int:
+    """Add to a key's pending count; returns the pending total."""
+    if key not in _access_counts and len(_access_counts) >= ACCESS_PENDING_MAX_KEYS:
+        return count
+    _access_counts[key] = _access_counts.get(key, 0) + count
+    return _access_counts[key]
+
+
+async def _flush_access_counts() -> None:
+    """Write pending access counts in one batched transaction."""
+    global _access_counts
+    if not _access_counts:
+        return
+    # Swap before awaiting so accesses during the write start a new batch
+    pending, _access_counts = _access_counts, {}
+    db = await get_db()
+    p1, p2 = db.placeholder(1), db.placeholder(2)
+    try:
+        await db.executemany(
+            f"""UPDATE memories SET
+               access_count = access_count + {p1},
+               last_accessed = CURRENT_TIMESTAMP
+               WHERE key = {p2}""",
+            [(count, key) for key, count in pending.items()],
+        )
+    except Exception:
+        # Keep the counts for the next attempt
+        for key, count in pending.items():
+            _record_access(key, count)
+        raise
+
+
+async def _try_flush_access_counts() -> bool:
+    """Flush without raising, logging only when flushing starts or stops failing."""
+    global _access_flush_failing
+    try:
+        await _flush_access_counts()
+    except Exception as e:
+        if not _access_flush_failing:
+            print(
+                f"WARNING: Failed to flush memory access counts, will retry: {e}",
+                file=sys.stderr,
+            )
+        _access_flush_failing = True
+        return False
+    if _access_flush_failing:
+        print("Memory access counts flushed after earlier failures", file=sys.stderr)
+    _access_flush_failing = False
+    return True
+
+
+async def _access_flush_loop() -> None:
+    delay = ACCESS_FLUSH_INTERVAL
+    while True:
+        await asyncio.sleep(delay)
+        if await _try_flush_access_counts():
+            delay = ACCESS_FLUSH_INTERVAL
+        else:
+            delay = min(delay * 2, ACCESS_FLUSH_MAX_INTERVAL)
+
+
 @mcp.tool()
 async def get_memory(key: str) -> dict:
     """Get a memory by its unique key.
@@ -578,22 +917,25 @@ async def get_memory(key: str) -> dict:
     Returns:
         Full memory with all fields
     """
+    global _access_flush_task
     db = await get_db()
     p1 = db.placeholder(1)
 
-    # Update access count and timestamp
-    await db.execute(
-        f"""UPDATE memories SET
-           access_count = access_count + 1,
-           last_accessed = CURRENT_TIMESTAMP
-           WHERE key = {p1}""",
-        key,
-    )
-
     row = await db.fetchone(f"SELECT * FROM memories WHERE key = {p1}", key)
-    if row:
-        return {"memory": row}
-    return {"error": f"No memory with key '{key}'"}
+    if not row:
+        return {"error": f"No memory with key '{key}'"}
+
+    # The access is recorded write-behind; report the count including it
+    row["access_count"] = (row["access_count"] or 0) + _record_access(key, 1)
+    # Flush early in the background; while flushes fail, retries are left to
+    # the backed-off loop
+    if (
+        len(_access_counts) >= ACCESS_FLUSH_MAX_KEYS
+        and not _access_flush_failing
+        and (_access_flush_task is None or _access_flush_task.done())
+    ):
+        _access_flush_task = asyncio.create_task(_try_flush_access_counts())
+    return {"memory": row}
 
 
 # =============================================================================
@@ -630,35 +972,212 @@ async def store_memory(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    if memory_type not in MEMORY_TYPES:
+    if memory_type not in VALID_MEMORY_TYPES:
         return {"error": f"Invalid memory_type. Must be one of: {MEMORY_TYPES}"}
 
     importance = max(1, min(10, importance))
     db = await get_db()
-    backend = get_backend()
 
     try:
-        if backend == Backend.SQLITE:
-            sql = """INSERT INTO memories
-                   (key, content, summary, memory_type, importance, tags, source_agent, system)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
-            await db.execute(sql, key, content, summary, memory_type, importance, tags, source_agent, system)
-            # Get last inserted ID
-            row = await db.fetchone("SELECT last_insert_rowid() as id")
-            return {"success": True, "id": row["id"], "key": key}
-        else:
-            sql = """INSERT INTO memories
-                   (key, content, summary, memory_type, importance, tags, source_agent, system)
-                   VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                   RETURNING id"""
-            row = await db.fetchone(sql, key, content, summary, memory_type, importance, tags, source_agent, system)
-            return {"success": True, "id": row["id"], "key": key}
+        memory_id = await _insert_returning_id(
+            db, "memories", _MEMORY_INSERT_COLUMNS,
+            key, content, summary, memory_type, importance, tags, source_agent, system,
+        )
+        _note_write()
+        return {"success": True, "id": memory_id, "key": key}
     except Exception as e:
-        if "UNIQUE constraint" in str(e) or "unique" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": f"Memory with key '{key}' already exists. Use update_memory instead."}
         raise
 
 
+@mcp.tool()
+async def store_memories_bulk(memories: list[dict]) -> dict:
+    """Store several new memories in one transaction.
+
+    Use instead of repeated store_memory calls when saving a batch. All
+    memories are stored or none are.
+
+    Args:
+        memories: List of memory objects with the same fields as store_memory
+                  (key and content required; summary, memory_type, importance
+                  as an integer 1-10, tags, source_agent, system optional).
+                  Max 100 per call.
+
+    Returns:
+        dict with success status, count, and the new ids and keys in input order
+    """
+    if is_read_only():
+        return READ_ONLY_ERROR
+
+    if not memories:
+        return {"error": "No memories provided"}
+    if len(memories) > MAX_BULK_ITEMS:
+        return {"error": f"Too many memories. Maximum is {MAX_BULK_ITEMS} per call"}
+
+    rows = []
+    for i, memory in enumerate(memories):
+        if not isinstance(memory, dict):
+            return {"error": f"Memory {i}: must be an object"}
+        if field := _non_text_field(memory, _MEMORY_TEXT_FIELDS):
+            return {"error": f"Memory {i}: {field} must be a string"}
+        key = memory.get("key")
+        content = memory.get("content")
+        if not key or not content:
+            return {"error": f"Memory {i}: key and content are required"}
+        memory_type = memory.get("memory_type", "fact")
+        if memory_type not in VALID_MEMORY_TYPES:
+            return {
+                "error": f"Memory {i}: invalid memory_type. "
+                f"Must be one of: {MEMORY_TYPES}"
+            }
+        importance = memory.get("importance", 5)
+        # bool is an int subclass; reject it along with floats and strings
+        if (not isinstance(importance, int) or isinstance(importance, bool)
+                or not 1 <= importance <= 10):
+            return {"error": f"Memory {i}: importance must be an integer from 1 to 10"}
+        rows.append((
+            key, content, memory.get("summary"), memory_type, importance,
+            memory.get("tags"), memory.get("source_agent"), memory.get("system"),
+        ))
+
+    db = await get_db()
+
+    try:
+        ids = await _bulk_insert_ids(db, "memories", _MEMORY_INSERT_COLUMNS, rows)
+        _note_write()
+    except Exception as e:
+        if is_unique_violation(e):
+            return {
+                "error": "One or more memory keys already exist. Nothing was stored."
+            }
+        raise
+
+    keys = [row[0] for row in rows]
+    return {"success": True, "count": len(rows), "ids": ids, "keys": keys}
+
+
+# Column order for memory and entry inserts (single-row and bulk tools)
+_MEMORY_INSERT_COLUMNS = (
+    "key", "content", "summary", "memory_type", "importance", "tags", "source_agent",
+    "system",
+)
+_ENTRY_INSERT_COLUMNS = (
+    "agent", "task_type", "title", "details", "decision_rationale", "outcome", "tags",
+    "related_files",
+)
+
+
+# Text columns of a bulk memory item (memory_type is checked against its list)
+_MEMORY_TEXT_FIELDS = ("key", "content", "summary", "memory_type", "tags",
+                       "source_agent", "system")
+
+
+def _non_text_field(item: dict, fields: tuple[str, ...]) -> Optional[str]:
+    """Return the first of fields set to something other than a string or None.
+
+    Bulk rows are bound as typed arrays on PostgreSQL, where a stray number
+    or list would only fail inside the INSERT.
+    """
+    for name in fields:
+        value = item.get(name)
+        if value is not None and not isinstance(value, str):
+            return name
+    return None
+
+
+@lru_cache(maxsize=None)
+def _insert_sql(
+    dialect: type[DatabaseBackend],
+    table: str,
+    columns: tuple[str, ...],
+    returning: bool,
+) -> str:
+    """Build a single-row INSERT for a fixed column list."""
+    values = ", ".join(dialect.placeholder(i) for i in range(1, len(columns) + 1))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({values})"
+    return f"{sql} RETURNING id" if returning else sql
+
+
+async def _insert_returning_id(db, table: str, columns: tuple[str, ...], *args) -> int:
+    """Insert one row and return its id.
+
+    Uses INSERT ... RETURNING id where supported: one statement, and the id
+    cannot be confused with a concurrent insert's.
+    """
+    if db.supports_returning:
+        row = await db.fetchone(_insert_sql(type(db), table, columns, True), *args)
+        return row["id"]
+    async with db.transaction():
+        await db.execute(_insert_sql(type(db), table, columns, False), *args)
+        row = await db.fetchone("SELECT last_insert_rowid() as id")
+    return row["id"]
+
+
+# Non-text columns in the bulk inserts; PostgreSQL's unnest() needs typed arrays
+_INTEGER_INSERT_COLUMNS = frozenset({"importance"})
+
+
+@lru_cache(maxsize=None)
+def _unnest_insert_sql(table: str, columns: tuple[str, ...]) -> str:
+    """Build a PostgreSQL bulk INSERT that takes one array parameter per column.
+
+    RETURNING gives no ordering guarantee, so each row's id is drawn from
+    the table's sequence alongside its input position n before the insert,
+    and the ids are read back from that batch ordered by n.
+    """
+    arrays = ", ".join(
+        f"${i}::{'integer' if column in _INTEGER_INSERT_COLUMNS else 'text'}[]"
+        for i, column in enumerate(columns, 1)
+    )
+    cols = ", ".join(columns)
+    return (
+        f"WITH batch AS ("
+        f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) AS id, {cols}, n "
+        f"FROM unnest({arrays}) WITH ORDINALITY AS u({cols}, n)), "
+        f"inserted AS (INSERT INTO {table} (id, {cols}) SELECT id, {cols} FROM batch) "
+        f"SELECT id FROM batch ORDER BY n"
+    )
+
+
+async def _bulk_insert_ids(db, table: str, columns: tuple[str, ...],
+                           rows: list[tuple]) -> list[int]:
+    """Insert many rows atomically and return their ids in input order.
+
+    PostgreSQL sends the whole batch as one statement over unnest()ed
+    arrays. SQLite runs one prepared INSERT for every row in a single
+    transaction. The writer lock is held throughout, so the new ids are
+    consecutive and end at last_insert_rowid().
+    """
+    if is_postgresql():
+        result = await db.fetchall(
+            _unnest_insert_sql(table, columns), *(list(col) for col in zip(*rows))
+        )
+        return [row["id"] for row in result]
+    async with db.transaction():
+        await db.executemany(_insert_sql(type(db), table, columns, False), rows)
+        row = await db.fetchone("SELECT last_insert_rowid() as id")
+    last = row["id"]
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+@lru_cache(maxsize=64)
+def _update_sql(dialect: type[DatabaseBackend], table: str, fields: tuple[str, ...],
+                where_column: str, extra: tuple[str, ...] = (),
+                returning: str = "") -> str:
+    """Build an UPDATE for one shape of optional fields.
+
+    fields are bound in order, followed by the where_column value; extra
+    holds literal assignments such as timestamps. Each shape maps to one
+    SQL string, so repeated updates reuse the cached prepared statement.
+    """
+    sets = [f"{name} = {dialect.placeholder(i)}" for i, name in enumerate(fields, 1)]
+    sets.extend(extra)
+    where = dialect.placeholder(len(fields) + 1)
+    sql = f"UPDATE {table} SET {', '.join(sets)} WHERE {where_column} = {where}"
+    return f"{sql} RETURNING {returning}" if returning else sql
+
+
 @mcp.tool()
 async def update_memory(
     key: str,
@@ -684,77 +1203,33 @@ async def update_memory(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    if status and status not in MEMORY_STATUSES:
+    if status and status not in VALID_MEMORY_STATUSES:
         return {"error": f"Invalid status. Must be one of: {MEMORY_STATUSES}"}
 
-    db = await get_db()
-    backend = get_backend()
-
-    updates = []
-    params = []
-
-    if backend == Backend.SQLITE:
-        if content is not None:
-            updates.append("content = ?")
-            params.append(content)
-        if summary is not None:
-            updates.append("summary = ?")
-            params.append(summary)
-        if importance is not None:
-            updates.append("importance = ?")
-            params.append(max(1, min(10, importance)))
-        if tags is not None:
-            updates.append("tags = ?")
-            params.append(tags)
-        if status is not None:
-            updates.append("status = ?")
-            params.append(status)
-            if status == "promoted":
-                updates.append("promoted_at = CURRENT_TIMESTAMP")
-
-        if not updates:
-            return {"error": "No fields to update"}
-
-        params.append(key)
-        sql = f"UPDATE memories SET {', '.join(updates)} WHERE key = ?"
-    else:
-        param_idx = 1
-        if content is not None:
-            updates.append(f"content = ${param_idx}")
-            params.append(content)
-            param_idx += 1
-        if summary is not None:
-            updates.append(f"summary = ${param_idx}")
-            params.append(summary)
-            param_idx += 1
-        if importance is not None:
-            updates.append(f"importance = ${param_idx}")
-            params.append(max(1, min(10, importance)))
-            param_idx += 1
-        if tags is not None:
-            updates.append(f"tags = ${param_idx}")
-            params.append(tags)
-            param_idx += 1
-        if status is not None:
-            updates.append(f"status = ${param_idx}")
-            params.append(status)
-            param_idx += 1
-            if status == "promoted":
-                updates.append("promoted_at = CURRENT_TIMESTAMP")
-
-        if not updates:
-            return {"error": "No fields to update"}
+    fields = {
+        "content": content,
+        "summary": summary,
+        "importance": None if importance is None else max(1, min(10, importance)),
+        "tags": tags,
+        "status": status,
+    }
+    fields = {name: value for name, value in fields.items() if value is not None}
+    if not fields:
+        return {"error": "No fields to update"}
 
-        params.append(key)
-        sql = f"UPDATE memories SET {', '.join(updates)} WHERE key = ${param_idx}"
+    db = await get_db()
+    extra = ("promoted_at = CURRENT_TIMESTAMP",) if status == "promoted" else ()
+    sql = _update_sql(type(db), "memories", tuple(fields), "key", extra)
+    params = [*fields.values(), key]
 
     result = await db.execute(sql, *params)
+    _note_write()
 
     # Check if any rows were updated
     if "0" in result or result.endswith(" 0"):
         return {"error": f"No memory found with key '{key}'"}
 
-    return {"success": True, "key": key, "updated_fields": len([u for u in updates if "=" in u])}
+    return {"success": True, "key": key, "updated_fields": len(fields) + len(extra)}
 
 
 @mcp.tool()
@@ -786,26 +1261,65 @@ async def log_entry(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    if task_type not in TASK_TYPES:
+    if task_type not in VALID_TASK_TYPES:
         return {"error": f"Invalid task_type. Must be one of: {TASK_TYPES}"}
 
     db = await get_db()
-    backend = get_backend()
 
-    if backend == Backend.SQLITE:
-        sql = """INSERT INTO entries
-               (agent, task_type, title, details, decision_rationale, outcome, tags, related_files)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
-        await db.execute(sql, agent, task_type, title, details, decision_rationale, outcome, tags, related_files)
-        row = await db.fetchone("SELECT last_insert_rowid() as id")
-        return {"success": True, "id": row["id"], "title": title}
-    else:
-        sql = """INSERT INTO entries
-               (agent, task_type, title, details, decision_rationale, outcome, tags, related_files)
-               VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-               RETURNING id"""
-        row = await db.fetchone(sql, agent, task_type, title, details, decision_rationale, outcome, tags, related_files)
-        return {"success": True, "id": row["id"], "title": title}
+    entry_id = await _insert_returning_id(
+        db, "entries", _ENTRY_INSERT_COLUMNS,
+        agent, task_type, title, details, decision_rationale, outcome, tags,
+        related_files,
+    )
+    _note_write()
+    return {"success": True, "id": entry_id, "title": title}
+
+
+@mcp.tool()
+async def log_entries_bulk(entries: list[dict]) -> dict:
+    """Log several work entries in one transaction.
+
+    Args:
+        entries: List of entry objects with the same fields as log_entry
+                 (title and task_type required; details, decision_rationale,
+                 outcome, tags, related_files, agent optional). Max 100 per call.
+
+    Returns:
+        dict with success status, count and the new ids in input order
+    """
+    if is_read_only():
+        return READ_ONLY_ERROR
+
+    if not entries:
+        return {"error": "No entries provided"}
+    if len(entries) > MAX_BULK_ITEMS:
+        return {"error": f"Too many entries. Maximum is {MAX_BULK_ITEMS} per call"}
+
+    rows = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return {"error": f"Entry {i}: must be an object"}
+        if field := _non_text_field(entry, _ENTRY_INSERT_COLUMNS):
+            return {"error": f"Entry {i}: {field} must be a string"}
+        title = entry.get("title")
+        if not title:
+            return {"error": f"Entry {i}: title is required"}
+        task_type = entry.get("task_type")
+        if task_type not in VALID_TASK_TYPES:
+            return {
+                "error": f"Entry {i}: invalid task_type. Must be one of: {TASK_TYPES}"
+            }
+        rows.append((
+            entry.get("agent", "claude"), task_type, title, entry.get("details"),
+            entry.get("decision_rationale"), entry.get("outcome"), entry.get("tags"),
+            entry.get("related_files"),
+        ))
+
+    db = await get_db()
+    ids = await _bulk_insert_ids(db, "entries", _ENTRY_INSERT_COLUMNS, rows)
+    _note_write()
+
+    return {"success": True, "count": len(rows), "ids": ids}
 
 
 @mcp.tool()
@@ -835,29 +1349,24 @@ async def store_knowledge(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    if category not in KB_CATEGORIES:
+    if category not in VALID_KB_CATEGORIES:
         return {"error": f"Invalid category. Must be one of: {KB_CATEGORIES}"}
 
     db = await get_db()
-    backend = get_backend()
 
+    # SQLite stores booleans as integers
+    protocol_value = is_protocol if is_postgresql() else int(is_protocol)
     try:
-        if backend == Backend.SQLITE:
-            sql = """INSERT INTO knowledge_base
-                   (category, title, content, tags, source_agent, system, is_protocol)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)"""
-            await db.execute(sql, category, title, content, tags, source_agent, system, 1 if is_protocol else 0)
-            row = await db.fetchone("SELECT last_insert_rowid() as id")
-            return {"success": True, "id": row["id"], "title": title}
-        else:
-            sql = """INSERT INTO knowledge_base
-                   (category, title, content, tags, source_agent, system, is_protocol)
-                   VALUES ($1, $2, $3, $4, $5, $6, $7)
-                   RETURNING id"""
-            row = await db.fetchone(sql, category, title, content, tags, source_agent, system, is_protocol)
-            return {"success": True, "id": row["id"], "title": title}
+        kb_id = await _insert_returning_id(
+            db, "knowledge_base",
+            ("category", "title", "content", "tags", "source_agent", "system",
+             "is_protocol"),
+            category, title, content, tags, source_agent, system, protocol_value,
+        )
+        _note_write()
+        return {"success": True, "id": kb_id, "title": title}
     except Exception as e:
-        if "UNIQUE constraint" in str(e) or "unique" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": f"Knowledge entry with category '{category}' and title '{title}' already exists."}
         raise
 
@@ -887,78 +1396,53 @@ async def update_knowledge(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    db = await get_db()
-    backend = get_backend()
-
-    # First verify the entry exists
-    p1 = db.placeholder(1)
-    existing = await db.fetchone(f"SELECT id, title FROM knowledge_base WHERE id = {p1}", id)
-    if not existing:
-        return {"error": f"No knowledge base entry with id {id}"}
-
-    updates = []
-    params = []
-
-    if backend == Backend.SQLITE:
-        if content is not None:
-            updates.append("content = ?")
-            params.append(content)
-        if tags is not None:
-            updates.append("tags = ?")
-            params.append(tags)
-        if is_protocol is not None:
-            updates.append("is_protocol = ?")
-            params.append(1 if is_protocol else 0)
-        if source_url is not None:
-            updates.append("source_url = ?")
-            params.append(source_url)
-
-        if not updates:
-            return {"error": "No fields to update"}
-
-        # Always update updated_at timestamp
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-
-        params.append(id)
-        sql = f"UPDATE knowledge_base SET {', '.join(updates)} WHERE id = ?"
-    else:
-        param_idx = 1
-        if content is not None:
-            updates.append(f"content = ${param_idx}")
-            params.append(content)
-            param_idx += 1
-        if tags is not None:
-            updates.append(f"tags = ${param_idx}")
-            params.append(tags)
-            param_idx += 1
-        if is_protocol is not None:
-            updates.append(f"is_protocol = ${param_idx}")
-            params.append(is_protocol)
-            param_idx += 1
-        if source_url is not None:
-            updates.append(f"source_url = ${param_idx}")
-            params.append(source_url)
-            param_idx += 1
-
-        if not updates:
-            return {"error": "No fields to update"}
-
-        # Always update updated_at timestamp
-        updates.append("updated_at = CURRENT_TIMESTAMP")
+    fields = {
+        "content": content,
+        "tags": tags,
+        # SQLite stores booleans as integers
+        "is_protocol": (
+            is_protocol if is_protocol is None or is_postgresql() else int(is_protocol)
+        ),
+        "source_url": source_url,
+    }
+    fields = {name: value for name, value in fields.items() if value is not None}
+    if not fields:
+        return {"error": "No fields to update"}
 
-        params.append(id)
-        sql = f"UPDATE knowledge_base SET {', '.join(updates)} WHERE id = ${param_idx}"
+    db = await get_db()
+    # Always update updated_at timestamp
+    extra = ("updated_at = CURRENT_TIMESTAMP",)
+    params = [*fields.values(), id]
 
     try:
-        await db.execute(sql, *params)
+        if db.supports_returning:
+            # Single round-trip: RETURNING doubles as the existence check
+            sql = _update_sql(
+                type(db), "knowledge_base", tuple(fields), "id", extra, "title"
+            )
+            updated = await db.fetchone(sql, *params)
+        else:
+            async with db.transaction():
+                await db.execute(
+                    _update_sql(type(db), "knowledge_base", tuple(fields), "id", extra),
+                    *params,
+                )
+                updated = await db.fetchone(
+                    f"SELECT title FROM knowledge_base WHERE id = {db.placeholder(1)}",
+                    id,
+                )
+        _note_write()
     except Exception as e:
         return {"error": f"Failed to update knowledge entry: {e}"}
 
+    if not updated:
+        return {"error": f"No knowledge base entry with id {id}"}
+
     return {
         "success": True,
         "id": id,
-        "title": existing["title"],
-        "updated_fields": len([u for u in updates if "=" in u and "updated_at" not in u]),
+        "title": updated["title"],
+        "updated_fields": len(fields),
     }
 
 
@@ -967,21 +1451,69 @@ async def update_knowledge(
 # =============================================================================
 
 
+# Every row count in one statement; names come from the fixed TABLES list
+_LIST_TABLES_SQL = "SELECT " + ", ".join(
+    f"(SELECT COUNT(*) FROM {table}) AS {table}" for table in TABLES
+)
+
+# PostgreSQL planner estimates: O(1) per table, refreshed by (auto)ANALYZE.
+# reltuples is -1 for a table never analyzed; report 0 then.
+_APPROX_TABLES_SQL = "SELECT " + ", ".join(
+    f"(SELECT GREATEST(reltuples, 0)::bigint FROM pg_class"
+    f" WHERE oid = '{table}'::regclass) AS {table}"
+    for table in TABLES
+)
+
+
 @mcp.tool()
-async def list_tables() -> dict:
+async def list_tables(approximate: bool = False) -> dict:
     """List all available tables and their row counts.
 
+    Args:
+        approximate: Use PostgreSQL's planner estimates instead of exact
+            counts (ignored on SQLite, which always counts exactly)
+
     Returns:
         dict with table names and counts
     """
     db = await get_db()
-    tables = {}
+    approximate = approximate and is_postgresql()
+    row = await db.fetchone(_APPROX_TABLES_SQL if approximate else _LIST_TABLES_SQL)
+    result = {"tables": dict(row), "backend": get_backend().value}
+    if approximate:
+        result["approximate"] = True
+    return result
 
-    for table in TABLES:
-        row = await db.fetchone(f"SELECT COUNT(*) as count FROM {table}")
-        tables[table] = row["count"] if row else 0
 
-    return {"tables": tables, "backend": get_backend().value}
+@mcp.tool()
+async def start_session(
+    topic: str,
+    memory_types: Optional[str] = None,
+    min_importance: int = 5,
+    include_recent: bool = True,
+    limit: int = 15,
+) -> dict:
+    """Load session-start context in one call: table counts plus recall_context.
+
+    Equivalent to list_tables followed by recall_context, without the extra
+    tool round trip. Arguments are passed through to recall_context. Both
+    are reads and run concurrently (on separate SQLite readers or pool
+    connections).
+
+    Returns:
+        dict with 'tables', 'backend' and 'context' (the recall_context result)
+    """
+    tables, context = await asyncio.gather(
+        list_tables.fn(),
+        recall_context.fn(
+            topic=topic,
+            memory_types=memory_types,
+            min_importance=min_importance,
+            include_recent=include_recent,
+            limit=limit,
+        ),
+    )
+    return {**tables, "context": context}
 
 
 @mcp.tool()
@@ -1001,7 +1533,6 @@ async def get_recent_entries(
         dict with recent entries
     """
     db = await get_db()
-    backend = get_backend()
     interval = db.interval_days(days)
 
     if agent:
@@ -1037,6 +1568,26 @@ async def get_recent_entries(
 # =============================================================================
 
 
+@lru_cache(maxsize=None)
+def _agent_for_hostname(hostname: str, hostname_map: str) -> Optional[str]:
+    """Resolve a hostname against a WORKLOG_HOSTNAME_MAP value.
+
+    Patterns are tried longest-first so a specific pattern beats a shorter
+    one it contains. Cached on (hostname, map) since neither changes within a
+    process in practice.
+    """
+    patterns = []
+    for mapping in hostname_map.split(","):
+        if ":" in mapping:
+            host_pattern, agent = mapping.split(":", 1)
+            patterns.append((host_pattern.lower(), agent.lower()))
+    patterns.sort(key=lambda pa: len(pa[0]), reverse=True)
+    for host_pattern, agent in patterns:
+        if host_pattern in hostname:
+            return agent
+    return None
+
+
 def _detect_agent() -> str:
     """Auto-detect agent name from environment or hostname.
 
@@ -1045,24 +1596,18 @@ def _detect_agent() -> str:
     2. Hostname-based detection (configurable)
     3. Default: "claude"
     """
-    import os
-
     # Priority 1: Explicit environment variable
     agent_name = os.environ.get("WORKLOG_AGENT_NAME")
     if agent_name:
         return agent_name.lower()
 
     # Priority 2: Hostname-based (for multi-agent setups)
-    hostname = os.uname().nodename.lower()
-
     # Check for custom hostname mapping via env (format: "hostname1:agent1,hostname2:agent2")
     hostname_map = os.environ.get("WORKLOG_HOSTNAME_MAP", "")
     if hostname_map:
-        for mapping in hostname_map.split(","):
-            if ":" in mapping:
-                host_pattern, agent = mapping.split(":", 1)
-                if host_pattern.lower() in hostname:
-                    return agent.lower()
+        agent = _agent_for_hostname(os.uname().nodename.lower(), hostname_map)
+        if agent:
+            return agent
 
     # Priority 3: Default
     return "claude"
@@ -1092,34 +1637,21 @@ async def send_message(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    from worklog_mcp.config import AGENTS, CHAT_PRIORITIES
-
     if to_agent not in AGENTS:
-        return {"error": f"Invalid agent. Must be one of: {AGENTS}"}
+        return {"error": f"Invalid agent. Must be one of: {list(AGENT_NAMES)}"}
 
-    if priority not in CHAT_PRIORITIES:
+    if priority not in VALID_CHAT_PRIORITIES:
         return {"error": f"Invalid priority. Must be one of: {CHAT_PRIORITIES}"}
 
     if not from_agent:
         from_agent = _detect_agent()
 
     db = await get_db()
-    backend = get_backend()
 
-    if backend == Backend.SQLITE:
-        sql = """INSERT INTO agent_chat
-               (from_agent, to_agent, message, context, priority)
-               VALUES (?, ?, ?, ?, ?)"""
-        await db.execute(sql, from_agent, to_agent, message, context, priority)
-        row = await db.fetchone("SELECT last_insert_rowid() as id")
-        message_id = row["id"]
-    else:
-        sql = """INSERT INTO agent_chat
-               (from_agent, to_agent, message, context, priority)
-               VALUES ($1, $2, $3, $4, $5)
-               RETURNING id"""
-        row = await db.fetchone(sql, from_agent, to_agent, message, context, priority)
-        message_id = row["id"]
+    message_id = await _insert_returning_id(
+        db, "agent_chat", ("from_agent", "to_agent", "message", "context", "priority"),
+        from_agent, to_agent, message, context, priority,
+    )
 
     return {
         "message_id": message_id,
@@ -1130,6 +1662,24 @@ async def send_message(
     }
 
 
+# check_messages output. Messages delivered by the call report their
+# status from before it marked them read.
+_MESSAGE_COLUMNS = (
+    "id, from_agent, to_agent, message, context, priority, "
+    "status, parent_id, response, created_at, read_at"
+)
+_DELIVERED_COLUMNS = (
+    "id, from_agent, to_agent, message, context, priority, "
+    "'pending' AS status, parent_id, response, created_at, "
+    "CAST(NULL AS TIMESTAMP) AS read_at"
+)
+_MESSAGE_ORDER = (
+    "CASE priority WHEN 'urgent' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END, "
+    "created_at DESC"
+)
+_PRIORITY_RANK = {"urgent": 0, "normal": 1}
+
+
 @mcp.tool()
 async def check_messages(
     agent: Optional[str] = None,
@@ -1148,59 +1698,62 @@ async def check_messages(
         agent = _detect_agent()
 
     db = await get_db()
-    backend = get_backend()
-
-    statuses = ["pending", "read"] if include_read else ["pending"]
-
-    if backend == Backend.SQLITE:
-        status_placeholders = ", ".join(["?" for _ in statuses])
+    p1 = db.placeholder(1)
+    inbox = f"(to_agent = {p1} OR to_agent = 'all') AND from_agent != {p1}"
+    read_sql = (
+        f"SELECT {_MESSAGE_COLUMNS} FROM agent_chat "
+        f"WHERE {inbox} AND status = 'read'"
+    )
+    # SQLite placeholders are positional, so the agent is bound twice
+    args = (agent,) if is_postgresql() else (agent, agent)
+
+    if is_postgresql():
+        # One statement: the CTE marks pending messages read and returns
+        # them; the rest of the query still sees the pre-update snapshot, so
+        # already-read messages are not duplicated
+        inbox_rows = "SELECT * FROM delivered"
+        if include_read:
+            inbox_rows += f" UNION ALL {read_sql}"
         sql = f"""
-            SELECT id, from_agent, to_agent, message, context, priority,
-                   status, parent_id, response, created_at, read_at
-            FROM agent_chat
-            WHERE (to_agent = ? OR to_agent = 'all')
-              AND from_agent != ?
-              AND status IN ({status_placeholders})
-            ORDER BY
-                CASE priority WHEN 'urgent' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END,
-                created_at DESC
-        """
-        rows = await db.fetchall(sql, agent, agent, *statuses)
+            WITH delivered AS (
+                UPDATE agent_chat SET status = 'read', read_at = CURRENT_TIMESTAMP
+                WHERE {inbox} AND status = 'pending'
+                RETURNING {_DELIVERED_COLUMNS}
+            )
+            SELECT * FROM ({inbox_rows}) AS inbox
+            ORDER BY {_MESSAGE_ORDER}"""
+        messages = await db.fetchall(sql, *args)
+    elif db.supports_returning:
+        # SQLite has no data-modifying CTEs; read rows first, then mark and
+        # return pending ones with UPDATE ... RETURNING, in one transaction
+        async with db.transaction():
+            messages = await db.fetchall(read_sql, *args) if include_read else []
+            messages += await db.fetchall(
+                f"""UPDATE agent_chat SET status = 'read', read_at = CURRENT_TIMESTAMP
+                   WHERE {inbox} AND status = 'pending'
+                   RETURNING {_DELIVERED_COLUMNS}""",
+                *args,
+            )
+        # RETURNING has no ORDER BY: newest first, then by priority
+        messages.sort(key=lambda m: m["created_at"] or "", reverse=True)
+        messages.sort(key=lambda m: _PRIORITY_RANK.get(m["priority"], 2))
     else:
-        sql = """
-            SELECT id, from_agent, to_agent, message, context, priority,
-                   status, parent_id, response, created_at, read_at
-            FROM agent_chat
-            WHERE (to_agent = $1 OR to_agent = 'all')
-              AND from_agent != $1
-              AND status = ANY($2::text[])
-            ORDER BY
-                CASE priority WHEN 'urgent' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END,
-                created_at DESC
-        """
-        rows = await db.fetchall(sql, agent, statuses)
-
-    messages = rows
-
-    # Mark pending messages as read
-    if messages:
-        pending_ids = [m["id"] for m in messages if m["status"] == "pending"]
-        if pending_ids:
-            if backend == Backend.SQLITE:
-                id_placeholders = ", ".join(["?" for _ in pending_ids])
+        statuses = "'pending', 'read'" if include_read else "'pending'"
+        async with db.transaction():
+            messages = await db.fetchall(
+                f"""SELECT {_MESSAGE_COLUMNS} FROM agent_chat
+                   WHERE {inbox} AND status IN ({statuses})
+                   ORDER BY {_MESSAGE_ORDER}""",
+                *args,
+            )
+            pending_ids = [m["id"] for m in messages if m["status"] == "pending"]
+            if pending_ids:
                 await db.execute(
                     f"""UPDATE agent_chat
                        SET status = 'read', read_at = CURRENT_TIMESTAMP
-                       WHERE id IN ({id_placeholders})""",
+                       WHERE id IN ({', '.join('?' for _ in pending_ids)})""",
                     *pending_ids,
                 )
-            else:
-                await db.execute(
-                    """UPDATE agent_chat
-                       SET status = 'read', read_at = CURRENT_TIMESTAMP
-                       WHERE id = ANY($1::int[])""",
-                    pending_ids,
-                )
 
     return {
         "messages": messages,
@@ -1234,32 +1787,35 @@ async def reply_message(
         from_agent = _detect_agent()
 
     db = await get_db()
-    backend = get_backend()
     p1 = db.placeholder(1)
 
-    # Get the original message
-    original = await db.fetchone(f"SELECT * FROM agent_chat WHERE id = {p1}", message_id)
+    # Lookup and update commit together
+    async with db.transaction():
+        # Get the original message
+        original = await db.fetchone(
+            f"SELECT * FROM agent_chat WHERE id = {p1}", message_id
+        )
 
-    if not original:
-        return {"error": f"Message {message_id} not found"}
+        if not original:
+            return {"error": f"Message {message_id} not found"}
 
-    new_status = "resolved" if resolve else "replied"
+        new_status = "resolved" if resolve else "replied"
 
-    # Update original message with response
-    if backend == Backend.SQLITE:
-        await db.execute(
-            """UPDATE agent_chat
-               SET response = ?, status = ?, resolved_at = CURRENT_TIMESTAMP
-               WHERE id = ?""",
-            response, new_status, message_id,
-        )
-    else:
-        await db.execute(
-            """UPDATE agent_chat
-               SET response = $1, status = $2, resolved_at = CURRENT_TIMESTAMP
-               WHERE id = $3""",
-            response, new_status, message_id,
-        )
+        # Update original message with response
+        if not is_postgresql():
+            await db.execute(
+                """UPDATE agent_chat
+                   SET response = ?, status = ?, resolved_at = CURRENT_TIMESTAMP
+                   WHERE id = ?""",
+                response, new_status, message_id,
+            )
+        else:
+            await db.execute(
+                """UPDATE agent_chat
+                   SET response = $1, status = $2, resolved_at = CURRENT_TIMESTAMP
+                   WHERE id = $3""",
+                response, new_status, message_id,
+            )
 
     return {
         "status": "replied",
@@ -1321,7 +1877,6 @@ async def normalize_tag(tag: str) -> dict:
         dict with canonical_tag, was_alias, and taxonomy entry if found
     """
     db = await get_db()
-    backend = get_backend()
 
     tag_lower = tag.lower().strip()
 
@@ -1342,7 +1897,7 @@ async def normalize_tag(tag: str) -> dict:
         }
 
     # Check if it's an alias
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         # SQLite: Check if tag is in comma-separated aliases or JSON array
         rows = await db.fetchall("SELECT * FROM tag_taxonomy")
         for r in rows:
@@ -1448,17 +2003,19 @@ async def add_tag_taxonomy(
         return READ_ONLY_ERROR
 
     db = await get_db()
-    backend = get_backend()
 
     alias_list = [a.strip() for a in (aliases or "").split(",") if a.strip()]
 
     try:
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             sql = """INSERT INTO tag_taxonomy
                    (canonical_tag, aliases, category, description)
                    VALUES (?, ?, ?, ?)"""
-            await db.execute(sql, canonical_tag, ",".join(alias_list), category, description)
-            row = await db.fetchone("SELECT last_insert_rowid() as id")
+            async with db.transaction():
+                await db.execute(
+                    sql, canonical_tag, ",".join(alias_list), category, description
+                )
+                row = await db.fetchone("SELECT last_insert_rowid() as id")
             return {"success": True, "id": row["id"], "canonical_tag": canonical_tag}
         else:
             sql = """INSERT INTO tag_taxonomy
@@ -1468,7 +2025,7 @@ async def add_tag_taxonomy(
             row = await db.fetchone(sql, canonical_tag, alias_list, category, description)
             return {"success": True, "id": row["id"], "canonical_tag": canonical_tag}
     except Exception as e:
-        if "unique" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": f"Tag '{canonical_tag}' already exists in taxonomy"}
         raise
 
@@ -1503,30 +2060,30 @@ async def add_relationship(
         return READ_ONLY_ERROR
 
     # Validate table names
-    if source_table not in ENTRY_TABLES:
+    if source_table not in VALID_ENTRY_TABLES:
         return {"error": f"Invalid source_table. Must be one of: {ENTRY_TABLES}"}
-    if target_table not in ENTRY_TABLES:
+    if target_table not in VALID_ENTRY_TABLES:
         return {"error": f"Invalid target_table. Must be one of: {ENTRY_TABLES}"}
 
     # Validate relationship type
-    if relationship_type not in RELATIONSHIP_TYPES:
+    if relationship_type not in VALID_RELATIONSHIP_TYPES:
         return {"error": f"Invalid relationship_type. Must be one of: {RELATIONSHIP_TYPES}"}
 
     # Validate confidence
     confidence = max(0.0, min(1.0, confidence))
 
     db = await get_db()
-    backend = get_backend()
 
     try:
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             sql = """INSERT INTO relationships
                    (source_table, source_id, target_table, target_id,
                     relationship_type, confidence, bidirectional, created_by)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
-            await db.execute(sql, source_table, source_id, target_table, target_id,
-                           relationship_type, confidence, bidirectional, created_by)
-            row = await db.fetchone("SELECT last_insert_rowid() as id")
+            async with db.transaction():
+                await db.execute(sql, source_table, source_id, target_table, target_id,
+                               relationship_type, confidence, bidirectional, created_by)
+                row = await db.fetchone("SELECT last_insert_rowid() as id")
             return {"success": True, "id": row["id"]}
         else:
             sql = """INSERT INTO relationships
@@ -1538,7 +2095,7 @@ async def add_relationship(
                                    relationship_type, confidence, bidirectional, created_by)
             return {"success": True, "id": row["id"]}
     except Exception as e:
-        if "unique" in str(e).lower() or "duplicate" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": "This relationship already exists"}
         if "Invalid source reference" in str(e) or "Invalid target reference" in str(e):
             return {"error": str(e)}
@@ -1563,16 +2120,15 @@ async def get_relationships(
     Returns:
         dict with outgoing and incoming relationships
     """
-    if entry_table not in ENTRY_TABLES:
+    if entry_table not in VALID_ENTRY_TABLES:
         return {"error": f"Invalid entry_table. Must be one of: {ENTRY_TABLES}"}
 
     db = await get_db()
-    backend = get_backend()
 
     results = {"outgoing": [], "incoming": [], "entry_table": entry_table, "entry_id": entry_id}
 
     # Build base queries
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         out_sql = """SELECT * FROM relationships
                     WHERE source_table = ? AND source_id = ?"""
         in_sql = """SELECT * FROM relationships
@@ -1641,16 +2197,16 @@ async def create_topic(
         return READ_ONLY_ERROR
 
     db = await get_db()
-    backend = get_backend()
 
     term_list = [t.strip() for t in (key_terms or "").split(",") if t.strip()]
 
     try:
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             sql = """INSERT INTO topic_index (topic_name, summary, key_terms)
                    VALUES (?, ?, ?)"""
-            await db.execute(sql, topic_name, summary, ",".join(term_list))
-            row = await db.fetchone("SELECT last_insert_rowid() as id")
+            async with db.transaction():
+                await db.execute(sql, topic_name, summary, ",".join(term_list))
+                row = await db.fetchone("SELECT last_insert_rowid() as id")
             return {"success": True, "id": row["id"], "topic_name": topic_name}
         else:
             sql = """INSERT INTO topic_index (topic_name, summary, key_terms)
@@ -1659,7 +2215,7 @@ async def create_topic(
             row = await db.fetchone(sql, topic_name, summary, term_list)
             return {"success": True, "id": row["id"], "topic_name": topic_name}
     except Exception as e:
-        if "unique" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": f"Topic '{topic_name}' already exists"}
         raise
 
@@ -1685,13 +2241,12 @@ async def add_topic_entry(
     if is_read_only():
         return READ_ONLY_ERROR
 
-    if entry_table not in ENTRY_TABLES:
+    if entry_table not in VALID_ENTRY_TABLES:
         return {"error": f"Invalid entry_table. Must be one of: {ENTRY_TABLES}"}
 
     relevance_score = max(0.0, min(1.0, relevance_score))
 
     db = await get_db()
-    backend = get_backend()
 
     # Get topic ID
     p1 = db.placeholder(1)
@@ -1702,7 +2257,7 @@ async def add_topic_entry(
     topic_id = topic["id"]
 
     try:
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             sql = """INSERT INTO topic_entries (topic_id, entry_table, entry_id, relevance_score)
                    VALUES (?, ?, ?, ?)"""
             await db.execute(sql, topic_id, entry_table, entry_id, relevance_score)
@@ -1714,7 +2269,7 @@ async def add_topic_entry(
             row = await db.fetchone(sql, topic_id, entry_table, entry_id, relevance_score)
             return {"success": True, "id": row["id"], "topic_name": topic_name}
     except Exception as e:
-        if "unique" in str(e).lower():
+        if is_unique_violation(e):
             return {"error": "This entry is already in the topic"}
         if "Invalid entry reference" in str(e):
             return {"error": str(e)}
@@ -1740,7 +2295,6 @@ async def get_topic_entries(
         dict with topic info and entries
     """
     db = await get_db()
-    backend = get_backend()
 
     # Get topic
     p1 = db.placeholder(1)
@@ -1752,7 +2306,7 @@ async def get_topic_entries(
         return {"error": f"Topic '{topic_name}' not found"}
 
     # Get entries
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         sql = """SELECT te.*,
                  CASE te.entry_table
                    WHEN 'memories' THEN (SELECT key FROM memories WHERE id = te.entry_id)
@@ -1822,12 +2376,11 @@ async def update_topic_summary(
         return READ_ONLY_ERROR
 
     db = await get_db()
-    backend = get_backend()
 
     updates = []
     params = []
 
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         if summary is not None:
             updates.append("summary = ?")
             params.append(summary)
@@ -1903,31 +2456,33 @@ async def log_curation_run(
         return READ_ONLY_ERROR
 
     db = await get_db()
-    backend = get_backend()
 
     # Parse stats JSON if provided
     stats_json = {}
     if stats:
         try:
-            stats_json = json.loads(stats)
-        except json.JSONDecodeError:
+            stats_json = orjson.loads(stats)
+        except orjson.JSONDecodeError:
             stats_json = {"raw": stats}
 
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         sql = """INSERT INTO curation_history
                (operation, agent, stats, duration_seconds, success, error_message)
                VALUES (?, ?, ?, ?, ?, ?)"""
-        await db.execute(sql, operation, agent, json.dumps(stats_json),
-                        duration_seconds, 1 if success else 0, error_message)
-        row = await db.fetchone("SELECT last_insert_rowid() as id")
+        async with db.transaction():
+            await db.execute(sql, operation, agent, orjson.dumps(stats_json).decode(),
+                            duration_seconds, 1 if success else 0, error_message)
+            row = await db.fetchone("SELECT last_insert_rowid() as id")
         return {"success": True, "id": row["id"]}
     else:
         sql = """INSERT INTO curation_history
                (operation, agent, stats, duration_seconds, success, error_message)
                VALUES ($1, $2, $3::jsonb, $4, $5, $6)
                RETURNING id"""
-        row = await db.fetchone(sql, operation, agent, json.dumps(stats_json),
-                               duration_seconds, success, error_message)
+        row = await db.fetchone(
+            sql, operation, agent, orjson.dumps(stats_json).decode(),
+            duration_seconds, success, error_message,
+        )
         return {"success": True, "id": row["id"]}
 
 
@@ -1956,7 +2511,6 @@ async def recall_topic(
         dict with topic summary, key terms, and optionally linked entries
     """
     db = await get_db()
-    backend = get_backend()
     p1 = db.placeholder(1)
 
     # Get topic
@@ -1967,7 +2521,7 @@ async def recall_topic(
 
     if not topic:
         # Try partial match
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             topic = await db.fetchone(
                 "SELECT * FROM topic_index WHERE topic_name LIKE ? ORDER BY entry_count DESC LIMIT 1",
                 f"%{topic_name}%"
@@ -1992,7 +2546,7 @@ async def recall_topic(
 
     if include_entries and topic.get("entry_count", 0) > 0:
         # Get linked entries with titles
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             entries = await db.fetchall(
                 """SELECT te.entry_table, te.entry_id, te.relevance_score,
                    CASE te.entry_table
@@ -2043,14 +2597,13 @@ async def find_related(
     Returns:
         dict with related entries organized by depth level
     """
-    if entry_table not in ENTRY_TABLES:
+    if entry_table not in VALID_ENTRY_TABLES:
         return {"error": f"Invalid entry_table. Must be one of: {ENTRY_TABLES}"}
 
     depth = max(1, min(3, depth))  # Clamp to 1-3
     type_filter = [t.strip() for t in (relationship_types or "").split(",") if t.strip()]
 
     db = await get_db()
-    backend = get_backend()
 
     results = {"source": {"table": entry_table, "id": entry_id}, "levels": {}}
     visited = {(entry_table, entry_id)}
@@ -2062,7 +2615,7 @@ async def find_related(
 
         for table, eid in current_level:
             # Get outgoing relationships
-            if backend == Backend.SQLITE:
+            if not is_postgresql():
                 out_sql = """SELECT target_table, target_id, relationship_type, confidence
                             FROM relationships
                             WHERE source_table = ? AND source_id = ?"""
@@ -2154,7 +2707,6 @@ async def search_by_taxonomy(
         dict with matching entries grouped by table
     """
     db = await get_db()
-    backend = get_backend()
 
     # First, resolve the tag to its canonical form and get aliases
     tags_to_match = []
@@ -2169,7 +2721,7 @@ async def search_by_taxonomy(
             tag_lower
         )
 
-        if not taxonomy and backend == Backend.POSTGRESQL:
+        if not taxonomy and is_postgresql():
             # Check aliases
             taxonomy = await db.fetchone(
                 "SELECT * FROM tag_taxonomy WHERE $1 = ANY(LOWER(aliases::text)::text[])",
@@ -2189,7 +2741,7 @@ async def search_by_taxonomy(
 
     elif category:
         # Get all tags in this category
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             rows = await db.fetchall(
                 "SELECT canonical_tag, aliases FROM tag_taxonomy WHERE category = ?",
                 category
@@ -2215,7 +2767,7 @@ async def search_by_taxonomy(
     results = {"tags_matched": tags_to_match, "memories": [], "knowledge_base": []}
 
     # Build tag matching conditions
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         conditions = " OR ".join([
             f"tags = ? OR tags LIKE ? OR tags LIKE ? OR tags LIKE ?"
             for _ in tags_to_match
@@ -2278,10 +2830,9 @@ async def get_topic_hierarchy(
         dict with topic tree structure and statistics
     """
     db = await get_db()
-    backend = get_backend()
 
     # Get all topics
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         topics = await db.fetchall(
             "SELECT id, topic_name, summary, entry_count, key_terms FROM topic_index ORDER BY entry_count DESC"
         )
@@ -2297,7 +2848,7 @@ async def get_topic_hierarchy(
             return {"error": f"Topic '{root_topic}' not found"}
 
         # Find topics that share entries with root topic
-        if backend == Backend.SQLITE:
+        if not is_postgresql():
             related_ids = await db.fetchall(
                 """SELECT DISTINCT te2.topic_id
                    FROM topic_entries te1
@@ -2367,7 +2918,6 @@ async def get_curation_metrics(
     """
 
     db = await get_db()
-    backend = get_backend()
 
     metrics = {
         "generated_at": datetime.now().isoformat(),
@@ -2394,7 +2944,7 @@ async def get_curation_metrics(
             metrics["table_counts"][table] = -1  # Table doesn't exist
 
     # Curation activity (last N days)
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         activity = await db.fetchall(
             """SELECT operation, COUNT(*) as runs,
                       SUM(CASE WHEN success THEN 1 ELSE 0 END) as successful
@@ -2411,8 +2961,9 @@ async def get_curation_metrics(
             """SELECT operation, COUNT(*) as runs,
                       SUM(CASE WHEN success THEN 1 ELSE 0 END) as successful
                FROM curation_history
-               WHERE run_at > NOW() - INTERVAL '%s days'
-               GROUP BY operation""" % days
+               WHERE run_at > NOW() - make_interval(days => $1)
+               GROUP BY operation""",
+            days
         )
         last_run = await db.fetchone(
             "SELECT run_at, operation, success FROM curation_history ORDER BY run_at DESC LIMIT 1"
@@ -2429,7 +2980,7 @@ async def get_curation_metrics(
 
     # Quality indicators
     # 1. Orphan rate (entries without topics or relationships)
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         orphan_memories = await db.fetchone(
             """SELECT COUNT(*) as cnt FROM memories m
                WHERE importance >= 5
@@ -2461,7 +3012,7 @@ async def get_curation_metrics(
     orphan_rate = round(orphan_count / max(total_count, 1) * 100, 1)
 
     # 2. Pending duplicates
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         pending_dupes = await db.fetchone(
             "SELECT COUNT(*) as cnt FROM duplicate_candidates WHERE status = 'pending'"
         )
@@ -2471,7 +3022,7 @@ async def get_curation_metrics(
         )
 
     # 3. Tag coverage (entries with vs without tags)
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         tagged = await db.fetchone(
             "SELECT COUNT(*) as cnt FROM memories WHERE tags IS NOT NULL AND tags != ''"
         )
@@ -2491,7 +3042,7 @@ async def get_curation_metrics(
     tag_coverage = round(tagged_count / max(tagged_count + untagged_count, 1) * 100, 1)
 
     # 4. Staging memories awaiting promotion
-    if backend == Backend.SQLITE:
+    if not is_postgresql():
         staging = await db.fetchone(
             """SELECT COUNT(*) as cnt FROM memories
                WHERE status = 'staging' AND importance >= 6
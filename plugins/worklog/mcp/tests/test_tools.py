@@ -1,8 +1,79 @@
 """Tests for worklog-mcp tools."""
 
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from urllib.parse import unquote, urlparse
+
 import pytest
-from worklog_mcp.config import get_sqlite_path, TABLES, MEMORY_TYPES
-from worklog_mcp.server import _validate_columns, _validate_order_by, TABLE_COLUMNS
+
+from worklog_mcp import database, server
+from worklog_mcp.config import (
+    MEMORY_TYPES,
+    STATEMENT_CACHE_SIZE,
+    TABLES,
+    _get_dsn,
+    _parse_agents,
+    config_cache_clear,
+    get_pool_size,
+    get_postgresql_params,
+    get_sqlite_path,
+    get_statement_cache_size,
+    is_postgresql,
+)
+from worklog_mcp.database import (
+    PostgreSQLBackend,
+    SQLiteBackend,
+    is_unique_violation,
+)
+from worklog_mcp.server import (
+    TABLE_COLUMNS,
+    _agent_for_hostname,
+    _escape_search_wildcards,
+    _filter_clause,
+    _query_table_sql,
+    _serialize_result,
+    _unnest_insert_sql,
+    _validate_columns,
+    _validate_order_by,
+    check_messages,
+    get_memory,
+    list_tables,
+    log_entries_bulk,
+    log_entry,
+    query_table,
+    recall_context,
+    reply_message,
+    search_knowledge,
+    send_message,
+    start_session,
+    store_knowledge,
+    store_memories_bulk,
+    store_memory,
+    update_knowledge,
+    update_memory,
+)
+
+
+@pytest.fixture
+async def backend(monkeypatch, tmp_path):
+    """Serve the tools from a fresh SQLite database, closed after the test."""
+    db = SQLiteBackend(tmp_path / "worklog.db")
+    await db.connect()
+    monkeypatch.setattr(database, "_db", db)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+@pytest.fixture(autouse=True)
+def recall_cache(monkeypatch):
+    """Start every test with an empty recall_context cache."""
+    monkeypatch.setattr(server, "_recall_cache", server.OrderedDict())
+    monkeypatch.setattr(server, "_write_generation", 0)
 
 
 def test_database_path_exists():
@@ -13,6 +84,38 @@ def test_database_path_exists():
     assert str(path).endswith("worklog.db")
 
 
+def test_sqlite_path_cached_until_cleared(monkeypatch, tmp_path):
+    """Test that config lookups are memoized and config_cache_clear resets them."""
+    config_cache_clear()
+    default = get_sqlite_path()
+    monkeypatch.setenv("WORKLOG_DB_PATH", str(tmp_path / "other.db"))
+    assert get_sqlite_path() == default
+
+    config_cache_clear()
+    assert get_sqlite_path() == tmp_path / "other.db"
+
+    monkeypatch.delenv("WORKLOG_DB_PATH")
+    config_cache_clear()
+
+
+def test_is_postgresql_follows_cache_clear(monkeypatch):
+    """Test that the backend flag is re-read after config_cache_clear."""
+    monkeypatch.setenv("WORKLOG_BACKEND", "postgresql")
+    config_cache_clear()
+    try:
+        assert is_postgresql()
+    finally:
+        monkeypatch.undo()
+        config_cache_clear()
+    assert not is_postgresql()
+
+
+def test_parse_agents_merges_defaults():
+    """Test that WORKLOG_AGENTS values are normalized and merged with the defaults."""
+    agents = _parse_agents(" Ops , ,builder,claude")
+    assert agents == ("claude", "all", "ops", "builder")
+
+
 def test_tables_defined():
     """Test that all expected core tables are defined."""
     # NOTE: sot_issues removed in INFA-614
@@ -28,54 +131,37 @@ def test_memory_types_defined():
 
 
 @pytest.mark.asyncio
-async def test_list_tables():
+async def test_list_tables(backend):
     """Test listing tables."""
-    from worklog_mcp.server import list_tables
-
-    try:
-        # FastMCP wraps functions - call the underlying fn
-        result = await list_tables.fn()
-        assert "tables" in result
-        for table in TABLES:
-            assert table in result["tables"]
-    except FileNotFoundError:
-        pytest.skip("Database not available")
+    # FastMCP wraps functions - call the underlying fn
+    result = await list_tables.fn()
+    assert "tables" in result
+    for table in TABLES:
+        assert table in result["tables"]
 
 
 @pytest.mark.asyncio
 async def test_query_table_invalid():
     """Test querying invalid table returns error."""
-    from worklog_mcp.server import query_table
-
     result = await query_table.fn(table="invalid_table")
     assert "error" in result
 
 
 @pytest.mark.asyncio
-async def test_query_table_memories():
+async def test_query_table_memories(backend):
     """Test querying memories table."""
-    from worklog_mcp.server import query_table
-
-    try:
-        result = await query_table.fn(table="memories", limit=5)
-        assert "rows" in result
-        assert "total" in result
-        assert isinstance(result["rows"], list)
-    except FileNotFoundError:
-        pytest.skip("Database not available")
+    result = await query_table.fn(table="memories", limit=5)
+    assert "rows" in result
+    assert "total" in result
+    assert isinstance(result["rows"], list)
 
 
 @pytest.mark.asyncio
-async def test_search_knowledge():
+async def test_search_knowledge(backend):
     """Test searching across tables."""
-    from worklog_mcp.server import search_knowledge
-
-    try:
-        result = await search_knowledge.fn(query="test", limit=5)
-        assert "results" in result
-        assert "tables_searched" in result
-    except FileNotFoundError:
-        pytest.skip("Database not available")
+    result = await search_knowledge.fn(query="test", limit=5)
+    assert "results" in result
+    assert "tables_searched" in result
 
 
 # =============================================================================
@@ -162,29 +248,22 @@ def test_table_columns_defined():
 
 
 @pytest.mark.asyncio
-async def test_query_table_with_filter():
+async def test_query_table_with_filter(backend):
     """Test query_table with parameterized filter."""
-    from worklog_mcp.server import query_table
-
-    try:
-        result = await query_table.fn(
-            table="memories",
-            filter_column="status",
-            filter_op="=",
-            filter_value="promoted",
-            limit=5
-        )
-        assert "rows" in result
-        assert "error" not in result
-    except FileNotFoundError:
-        pytest.skip("Database not available")
+    result = await query_table.fn(
+        table="memories",
+        filter_column="status",
+        filter_op="=",
+        filter_value="promoted",
+        limit=5
+    )
+    assert "rows" in result
+    assert "error" not in result
 
 
 @pytest.mark.asyncio
 async def test_query_table_invalid_filter_column():
     """Test that invalid filter columns are rejected."""
-    from worklog_mcp.server import query_table
-
     result = await query_table.fn(
         table="memories",
         filter_column="evil_column",
@@ -198,8 +277,6 @@ async def test_query_table_invalid_filter_column():
 @pytest.mark.asyncio
 async def test_query_table_invalid_filter_op():
     """Test that invalid filter operators are rejected."""
-    from worklog_mcp.server import query_table
-
     result = await query_table.fn(
         table="memories",
         filter_column="status",
@@ -208,3 +285,554 @@ async def test_query_table_invalid_filter_op():
     )
     assert "error" in result
     assert "Invalid filter operator" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_backend_async_context_manager(tmp_path):
+    """Test that backends open on enter and release the connection on exit."""
+    backend = SQLiteBackend(tmp_path / "worklog.db")
+    async with backend as db:
+        row = await db.fetchone("SELECT COUNT(*) as total FROM memories")
+        assert row["total"] == 0
+    assert backend._conn is None
+
+
+def test_agent_for_hostname_prefers_longest_pattern():
+    """Test that hostname mapping picks the most specific matching pattern."""
+    mapping = "build:builder,build-gpu:trainer,Ops:ops"
+    assert _agent_for_hostname("build-gpu-01", mapping) == "trainer"
+    assert _agent_for_hostname("build-02", mapping) == "builder"
+    assert _agent_for_hostname("ops-box", mapping) == "ops"
+    assert _agent_for_hostname("laptop", mapping) is None
+
+
+def test_postgresql_port_validation(monkeypatch):
+    """Test that PGPORT must be a number within the TCP port range."""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("PGHOST", "db.example")
+    monkeypatch.setenv("PGPASSWORD", "secret")
+    try:
+        for bad, message in (("54x2", "Invalid PGPORT"),
+                             ("70000", "between 1 and 65535")):
+            monkeypatch.setenv("PGPORT", bad)
+            config_cache_clear()
+            with pytest.raises(ValueError, match=message):
+                get_postgresql_params()
+
+        monkeypatch.setenv("PGPORT", "6432")
+        config_cache_clear()
+        assert get_postgresql_params()["port"] == 6432
+    finally:
+        monkeypatch.undo()
+        config_cache_clear()
+
+
+def test_serialize_result_handles_row_types():
+    """Test that the tool serializer encodes database row values."""
+    payload = {"rows": [{"id": 1, "created_at": datetime(2025, 1, 2, 3, 4, 5),
+                         "confidence": Decimal("0.5")}], "counts": {1: 2}}
+    decoded = json.loads(_serialize_result(payload))
+    assert decoded["rows"][0]["created_at"] == "2025-01-02T03:04:05"
+    assert decoded["rows"][0]["confidence"] == "0.5"
+    assert decoded["counts"] == {"1": 2}
+
+
+def test_dsn_escapes_credentials(monkeypatch):
+    """Test that reserved characters in PG* credentials are percent-encoded."""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("PGHOST", "db.example")
+    monkeypatch.setenv("PGPORT", "5432")
+    monkeypatch.setenv("PGUSER", "work@log")
+    monkeypatch.setenv("PGPASSWORD", "p@ss:w/rd")
+    config_cache_clear()
+    try:
+        parsed = urlparse(_get_dsn())
+        assert parsed.hostname == "db.example"
+        assert parsed.port == 5432
+        assert unquote(parsed.username) == "work@log"
+        assert unquote(parsed.password) == "p@ss:w/rd"
+    finally:
+        monkeypatch.undo()
+        config_cache_clear()
+
+
+def test_pool_size_from_environment(monkeypatch):
+    """Test pool sizing defaults and WORKLOG_POOL_MIN/MAX overrides."""
+    monkeypatch.delenv("WORKLOG_POOL_MIN", raising=False)
+    monkeypatch.delenv("WORKLOG_POOL_MAX", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    config_cache_clear()
+    try:
+        assert get_pool_size() == (2, 8)
+
+        monkeypatch.setattr("os.cpu_count", lambda: 32)
+        config_cache_clear()
+        assert get_pool_size() == (2, 50)
+
+        monkeypatch.setenv("WORKLOG_POOL_MAX", "1")
+        config_cache_clear()
+        assert get_pool_size() == (1, 1)
+
+        monkeypatch.setenv("WORKLOG_POOL_MAX", "lots")
+        config_cache_clear()
+        with pytest.raises(ValueError, match="WORKLOG_POOL_MAX"):
+            get_pool_size()
+    finally:
+        monkeypatch.undo()
+        config_cache_clear()
+
+
+def test_statement_cache_disabled_behind_pgbouncer(monkeypatch):
+    """Test that WORKLOG_PGBOUNCER turns off asyncpg's statement cache."""
+    monkeypatch.delenv("WORKLOG_PGBOUNCER", raising=False)
+    config_cache_clear()
+    try:
+        assert get_statement_cache_size() == STATEMENT_CACHE_SIZE
+
+        monkeypatch.setenv("WORKLOG_PGBOUNCER", "true")
+        config_cache_clear()
+        assert get_statement_cache_size() == 0
+    finally:
+        monkeypatch.undo()
+        config_cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_transaction_commits_and_rolls_back(backend):
+    """Test that SQLite transaction() is atomic and writes autocommit otherwise."""
+    insert = "INSERT INTO memories (key, content) VALUES (?, ?)"
+    mode = await backend.fetchone("PRAGMA journal_mode")
+    assert mode["journal_mode"] == "wal"
+
+    await backend.execute(insert, "a", "1")
+
+    async with backend.transaction():
+        await backend.execute(insert, "b", "2")
+        await backend.execute(insert, "c", "3")
+
+    with pytest.raises(RuntimeError):
+        async with backend.transaction():
+            await backend.execute(insert, "d", "4")
+            raise RuntimeError("abort")
+
+    rows = await backend.fetchall("SELECT key FROM memories ORDER BY key")
+    assert [r["key"] for r in rows] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fts_substring_search(tmp_path):
+    """Test that the trigram FTS index matches substrings and stays in sync."""
+    path = tmp_path / "worklog.db"
+    async with SQLiteBackend(path) as db:
+        await db.execute("INSERT INTO memories (key, content) VALUES (?, ?)",
+                         "ssh", "Configured SSH-Agent forwarding at 100% uptime")
+        # Simulate a database created before the FTS index existed
+        await db.execute("DROP TABLE memories_fts")
+
+    async with SQLiteBackend(path) as db:
+        assert db.supports_fts
+        sql = f"SELECT key FROM memories WHERE {db.fts_match('memories', '?')}"
+        columns = ("key", "content", "summary", "tags")
+
+        rows = await db.fetchall(sql, db.fts_query(columns, "ssh-agent"))
+        assert [r["key"] for r in rows] == ["ssh"]
+        rows = await db.fetchall(sql, db.fts_query(columns, '100% "up'))
+        assert rows == []
+        rows = await db.fetchall(sql, db.fts_query(columns, "100% up"))
+        assert [r["key"] for r in rows] == ["ssh"]
+
+        await db.execute("UPDATE memories SET content = ? WHERE key = ?",
+                         "rotated keys", "ssh")
+        assert await db.fetchall(sql, db.fts_query(columns, "forwarding")) == []
+        await db.execute("DELETE FROM memories WHERE key = ?", "ssh")
+        assert await db.fetchall(sql, db.fts_query(columns, "rotated")) == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fts_repaired_after_replace(monkeypatch, tmp_path):
+    """Test that WORKLOG_FTS_CHECK reindexes rows replaced behind the triggers."""
+    monkeypatch.setenv("WORKLOG_FTS_CHECK", "true")
+    path = tmp_path / "worklog.db"
+    async with SQLiteBackend(path) as db:
+        await db.execute(
+            "INSERT INTO memories (key, content) VALUES ('k', 'stale text')")
+
+    # What the sqlite3 CLI does for INSERT OR REPLACE: no delete trigger fires
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT OR REPLACE INTO memories (key, content) VALUES ('k', 'fresh')")
+    conn.commit()
+    conn.close()
+
+    async with SQLiteBackend(path) as db:
+        sql = f"SELECT key FROM memories WHERE {db.fts_match('memories', '?')}"
+        columns = ("key", "content", "summary", "tags")
+        assert await db.fetchall(sql, db.fts_query(columns, "stale")) == []
+        rows = await db.fetchall(sql, db.fts_query(columns, "fresh"))
+        assert [r["key"] for r in rows] == ["k"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fts_falls_back_without_trigram(monkeypatch, tmp_path):
+    """Test that a build without trigram support drops the triggers and uses LIKE."""
+    path = tmp_path / "worklog.db"
+    async with SQLiteBackend(path):
+        pass
+
+    async def no_trigram(self):
+        return False
+
+    with monkeypatch.context() as m:
+        m.setattr(SQLiteBackend, "_supports_trigram", no_trigram)
+        async with SQLiteBackend(path) as db:
+            assert not db.supports_fts
+            await db.execute(
+                "INSERT INTO memories (key, content) VALUES ('k', 'unindexed')")
+
+    async with SQLiteBackend(path) as db:
+        assert db.supports_fts
+        sql = f"SELECT key FROM memories WHERE {db.fts_match('memories', '?')}"
+        query = db.fts_query(("key", "content", "summary", "tags"), "unindexed")
+        assert [r["key"] for r in await db.fetchall(sql, query)] == ["k"]
+
+
+def test_postgresql_fts_helpers_use_ilike():
+    """Test that PostgreSQL's fts_match/fts_query degrade to escaped ILIKE."""
+    db = PostgreSQLBackend({})
+    assert not db.supports_fts
+    assert db.fts_match("memories", "$1") == (
+        "(key ILIKE $1 OR content ILIKE $1 OR summary ILIKE $1 OR tags ILIKE $1)")
+    assert db.fts_query(("content",), "a_b%") == "%a\\_b\\%%"
+
+
+def test_query_table_sql_cached_per_dialect():
+    """Test that query_table's SQL is cached per backend class, not instance."""
+    clause = _filter_clause(SQLiteBackend, "title", "ILIKE")
+    assert clause == "LOWER(title) LIKE LOWER(?)"
+    assert _filter_clause(PostgreSQLBackend, "title", "=") == "title = $1"
+    query, _ = _query_table_sql(PostgreSQLBackend, "entries", "*", "title = $1", "")
+    assert query.endswith("LIMIT $2 OFFSET $3")
+
+
+@pytest.mark.asyncio
+async def test_store_memories_bulk_is_atomic(backend):
+    """Test that bulk memory storage validates input and stores all-or-nothing."""
+    result = await store_memories_bulk.fn(memories=[{"key": "x"}])
+    assert "key and content are required" in result["error"]
+    for importance in ("high", None, 7.9, True, 0, 11):
+        result = await store_memories_bulk.fn(memories=[
+            {"key": "test_bulk_a", "content": "first"},
+            {"key": "test_bulk_b", "content": "second", "importance": importance},
+        ])
+        assert result == {
+            "error": "Memory 1: importance must be an integer from 1 to 10"}
+    for bad, field in (({"key": 5, "content": "c"}, "key"),
+                       ({"key": "k", "content": ["c"]}, "content"),
+                       ({"key": "k", "content": "c", "tags": ["a"]}, "tags")):
+        result = await store_memories_bulk.fn(memories=[bad])
+        assert result == {"error": f"Memory 0: {field} must be a string"}
+    result = await log_entries_bulk.fn(entries=[
+        {"title": "t", "task_type": "research", "details": {"x": 1}}])
+    assert result == {"error": "Entry 0: details must be a string"}
+
+    result = await store_memories_bulk.fn(memories=[
+        {"key": "test_bulk_a", "content": "first", "importance": 10},
+        {"key": "test_bulk_b", "content": "second", "memory_type": "context"},
+    ])
+    assert result["success"] is True
+    assert result["count"] == 2
+    ids = result["ids"]
+
+    result = await store_memories_bulk.fn(memories=[
+        {"key": "test_bulk_c", "content": "third"},
+        {"key": "test_bulk_a", "content": "duplicate"},
+    ])
+    assert "already exist" in result["error"]
+
+    rows = (await query_table.fn(table="memories", columns="id, key, importance",
+                                 filter_column="key", filter_op="LIKE",
+                                 filter_value="test_bulk_%", order_by="key"))["rows"]
+    assert rows == [{"id": ids[0], "key": "test_bulk_a", "importance": 10},
+                    {"id": ids[1], "key": "test_bulk_b", "importance": 5}]
+
+
+def test_unnest_insert_sql_types_each_column():
+    """Test the PostgreSQL bulk INSERT binds typed arrays and orders ids by input."""
+    sql = _unnest_insert_sql("memories", ("key", "importance"))
+    assert "unnest($1::text[], $2::integer[]) WITH ORDINALITY" in sql
+    assert "nextval(pg_get_serial_sequence('memories', 'id'))" in sql
+    assert sql.endswith("SELECT id FROM batch ORDER BY n")
+
+
+@pytest.mark.asyncio
+async def test_recall_context_splits_union_by_kind(backend):
+    """Test that recall_context's single query fills each bucket in order."""
+    await store_memory.fn(key="low", content="deploy notes", importance=5)
+    await store_memory.fn(key="high", content="deploy checklist", importance=9)
+    await store_memory.fn(key="other", content="unrelated", importance=9)
+    await store_knowledge.fn(category="development", title="Deploy guide",
+                             content="steps")
+    await log_entry.fn(title="Ran deploy", task_type="deployment")
+
+    for topic in ("deploy", "de"):  # trigram index and LIKE fallback
+        result = await recall_context.fn(topic=topic)
+        assert [m["key"] for m in result["memories"]] == ["high", "low"]
+        assert set(result["memories"][0]) == {
+            "id", "key", "content", "summary", "memory_type", "importance", "tags",
+            "created_at"}
+        assert [k["title"] for k in result["knowledge"]] == ["Deploy guide"]
+        assert [e["title"] for e in result["recent_work"]] == ["Ran deploy"]
+
+    result = await recall_context.fn(topic="deploy", include_recent=False)
+    assert result["recent_work"] == []
+
+
+def test_is_unique_violation_ignores_other_integrity_errors():
+    """Test that only UNIQUE failures map to the duplicate-key error."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (k TEXT UNIQUE NOT NULL)")
+    conn.execute("INSERT INTO t VALUES ('a')")
+    for value, expected in (("a", True), (None, False)):
+        with pytest.raises(sqlite3.IntegrityError) as exc_info:
+            conn.execute("INSERT INTO t VALUES (?)", (value,))
+        assert is_unique_violation(exc_info.value) is expected
+    assert not is_unique_violation(ValueError("unique"))
+
+
+@pytest.mark.asyncio
+async def test_update_memory_reuses_sql_per_field_shape(backend):
+    """Test that update_memory caches one UPDATE per set of fields."""
+    server._update_sql.cache_clear()
+
+    await store_memory.fn(key="k", content="old")
+    assert (await update_memory.fn(key="k"))["error"] == "No fields to update"
+    result = await update_memory.fn(key="k", content="new", importance=42,
+                                    status="promoted")
+    assert result == {"success": True, "key": "k", "updated_fields": 4}
+    await update_memory.fn(key="k", content="newer", importance=3)
+    await update_memory.fn(key="k", content="newest", importance=4)
+    assert server._update_sql.cache_info().currsize == 2
+
+    memory = (await get_memory.fn(key="k"))["memory"]
+    assert (memory["content"], memory["importance"], memory["status"]) == (
+        "newest", 4, "promoted")
+    assert memory["promoted_at"] is not None
+    assert "error" in await update_memory.fn(key="missing", content="x")
+
+
+@pytest.mark.asyncio
+async def test_check_messages_marks_read_in_one_transaction(backend):
+    """Test that check_messages reads and marks pending messages together."""
+    await send_message.fn(to_agent="claude", message="ping", from_agent="all")
+    first = await check_messages.fn(agent="claude")
+    assert [m["status"] for m in first["messages"]] == ["pending"]
+    assert (await check_messages.fn(agent="claude"))["count"] == 0
+
+    message_id = first["messages"][0]["id"]
+    reply = await reply_message.fn(message_id, "pong", from_agent="claude")
+    assert reply["resolved"] is True
+    assert "error" in await reply_message.fn(9999, "pong", from_agent="claude")
+
+
+@pytest.mark.asyncio
+async def test_search_wildcards_match_literally(backend):
+    """Test that % and _ in a LIKE-path search term are not wildcards."""
+    assert _escape_search_wildcards("plain") == "%plain%"
+    assert _escape_search_wildcards("a\\b%c_") == "%a\\\\b\\%c\\_%"
+
+    await store_memory.fn(key="underscore", content="a_b")
+    await store_memory.fn(key="letter", content="axb")
+    result = await search_knowledge.fn(query="_b", tables="memories")
+    assert [m["key"] for m in result["results"]["memories"]] == ["underscore"]
+
+
+@pytest.mark.asyncio
+async def test_get_memory_buffers_access_counts(backend, monkeypatch):
+    """Test that get_memory's access counts are written in batches."""
+    monkeypatch.setattr(server, "_access_counts", {})
+    sql = "SELECT access_count, last_accessed FROM memories WHERE key = 'k'"
+
+    await store_memory.fn(key="k", content="c")
+    for expected in (1, 2):
+        memory = (await get_memory.fn(key="k"))["memory"]
+        assert memory["access_count"] == expected
+    assert "error" in await get_memory.fn(key="missing")
+    row = await backend.fetchone(sql)
+    assert row["access_count"] == 0
+
+    await server._flush_access_counts()
+    row = await backend.fetchone(sql)
+    assert row["access_count"] == 2 and row["last_accessed"] is not None
+    assert server._access_counts == {}
+
+
+@pytest.mark.asyncio
+async def test_get_memory_survives_failing_flushes(backend, monkeypatch, capsys):
+    """Test that failed flushes never reach get_memory and stay bounded."""
+    monkeypatch.setattr(server, "_access_counts", {})
+    monkeypatch.setattr(server, "_access_flush_task", None)
+    monkeypatch.setattr(server, "_access_flush_failing", False)
+    monkeypatch.setattr(server, "ACCESS_FLUSH_MAX_KEYS", 2)
+    monkeypatch.setattr(server, "ACCESS_PENDING_MAX_KEYS", 3)
+
+    async def fail(*args):
+        raise RuntimeError("disk full")
+
+    for key in "abcd":
+        await store_memory.fn(key=key, content="c")
+    monkeypatch.setattr(backend, "executemany", fail)
+    for key in "abcd":
+        assert "memory" in await get_memory.fn(key=key)
+    await server._access_flush_task
+    for _ in range(2):
+        assert await server._try_flush_access_counts() is False
+    assert server._access_counts == {"a": 1, "b": 1, "c": 1}
+    assert capsys.readouterr().err.count("WARNING") == 1
+
+    monkeypatch.undo()
+    monkeypatch.setattr(server, "_access_counts", {"a": 1})
+    monkeypatch.setattr(server, "_access_flush_failing", True)
+    assert await server._try_flush_access_counts() is True
+    assert server._access_flush_failing is False
+
+
+@pytest.mark.asyncio
+async def test_recall_context_cache_invalidated_by_writes(backend, monkeypatch):
+    """Test that recall_context serves repeats from cache until a write."""
+    queries = []
+    fetchall = backend.fetchall
+
+    async def counting_fetchall(sql, *args):
+        queries.append(sql)
+        return await fetchall(sql, *args)
+
+    monkeypatch.setattr(backend, "fetchall", counting_fetchall)
+
+    await store_memory.fn(key="one", content="deploy notes")
+    first = await recall_context.fn(topic="deploy")
+    first["memories"].clear()
+    repeat = await recall_context.fn(topic="deploy")
+    assert len(queries) == 1
+    assert [m["key"] for m in repeat["memories"]] == ["one"]
+
+    await store_memory.fn(key="two", content="deploy checklist")
+    second = await recall_context.fn(topic="deploy")
+    assert {m["key"] for m in second["memories"]} == {"one", "two"}
+    assert len(queries) == 2
+
+    monkeypatch.setattr(server, "RECALL_CACHE_TTL", 0.0)
+    await recall_context.fn(topic="deploy", limit=5)
+    await recall_context.fn(topic="deploy", limit=5)
+    assert len(queries) == 4
+
+
+@pytest.mark.asyncio
+async def test_query_table_total_is_opt_in(backend):
+    """Test that query_table only counts matching rows when asked."""
+    for i in range(3):
+        await store_memory.fn(key=f"k{i}", content="c")
+    result = await query_table.fn(table="memories", columns="key", limit=2)
+    assert result["count"] == 2 and result["total"] is None
+    assert set(result["rows"][0]) == {"key"}
+
+    result = await query_table.fn(table="memories", columns="key", limit=2,
+                                  include_total=True)
+    assert result["total"] == 3 and set(result["rows"][0]) == {"key"}
+    result = await query_table.fn(table="memories", limit=2, offset=5,
+                                  include_total=True)
+    assert (result["count"], result["total"]) == (0, 3)
+    result = await query_table.fn(table="memories", limit=0, include_total=True)
+    assert (result["count"], result["total"]) == (0, 3)
+
+
+@pytest.mark.asyncio
+async def test_start_session_combines_counts_and_context(backend):
+    """Test that start_session returns list_tables and recall_context together."""
+    await store_memory.fn(key="k", content="deploy notes")
+    result = await start_session.fn(topic="deploy")
+    assert result["tables"]["memories"] == 1
+    assert result["backend"] == "sqlite"
+    assert [m["key"] for m in result["context"]["memories"]] == ["k"]
+    assert "error" in (await start_session.fn(topic="x" * 501))["context"]
+
+
+@pytest.mark.asyncio
+async def test_inserts_return_ids_with_and_without_returning(backend, monkeypatch):
+    """Test that write tools report the new row id on both insert paths."""
+    kb_sql = "SELECT id, is_protocol FROM knowledge_base WHERE title = ?"
+    for supports_returning, suffix in ((True, "a"), (False, "b")):
+        monkeypatch.setattr(backend, "supports_returning", supports_returning)
+        memory = await store_memory.fn(key=f"k{suffix}", content="c")
+        row = await backend.fetchone("SELECT id FROM memories WHERE key = ?",
+                                     f"k{suffix}")
+        assert memory["id"] == row["id"]
+        kb = await store_knowledge.fn(category="development", title=suffix,
+                                      content="c", is_protocol=True)
+        row = await backend.fetchone(kb_sql, suffix)
+        assert (kb["id"], row["is_protocol"]) == (row["id"], 1)
+        entry = await log_entry.fn(title=suffix, task_type="research")
+        assert entry["id"] > 0
+        sent = await send_message.fn(to_agent="all", message=suffix,
+                                     from_agent="claude")
+        assert sent["message_id"] > 0
+
+
+@pytest.mark.asyncio
+async def test_update_knowledge_with_and_without_returning(backend, monkeypatch):
+    """Test update_knowledge's cached UPDATE on both result paths."""
+    kb = await store_knowledge.fn(category="development", title="Guide", content="v1")
+    assert (await update_knowledge.fn(id=kb["id"]))["error"] == "No fields to update"
+    for supports_returning in (True, False):
+        monkeypatch.setattr(backend, "supports_returning", supports_returning)
+        result = await update_knowledge.fn(id=kb["id"], content="v2", is_protocol=True)
+        assert result == {"success": True, "id": kb["id"], "title": "Guide",
+                          "updated_fields": 2}
+        assert "error" in await update_knowledge.fn(id=9999, content="x")
+    row = await backend.fetchone("SELECT content, is_protocol FROM knowledge_base")
+    assert (row["content"], row["is_protocol"]) == ("v2", 1)
+
+
+@pytest.mark.asyncio
+async def test_check_messages_orders_and_includes_read(backend, monkeypatch):
+    """Test check_messages ordering and include_read on both SQLite paths."""
+    for supports_returning in (True, False):
+        monkeypatch.setattr(backend, "supports_returning", supports_returning)
+        await backend.execute("DELETE FROM agent_chat")
+        await send_message.fn(to_agent="claude", message="old", from_agent="all")
+        await check_messages.fn(agent="claude")
+        await send_message.fn(to_agent="claude", message="low", from_agent="all",
+                              priority="low")
+        await send_message.fn(to_agent="claude", message="urgent", from_agent="all",
+                              priority="urgent")
+        await send_message.fn(to_agent="all", message="mine", from_agent="claude")
+
+        result = await check_messages.fn(agent="claude", include_read=True)
+        assert [(m["message"], m["status"]) for m in result["messages"]] == [
+            ("urgent", "pending"), ("old", "read"), ("low", "pending")]
+        assert (await check_messages.fn(agent="claude"))["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_reads_use_read_only_connections(backend):
+    """Test that SELECTs go to the reader pool and see committed writes."""
+    assert backend._readers.qsize() == len(backend._reader_conns) > 0
+
+    async with backend._query_conn("SELECT 1") as conn:
+        assert conn is not backend._conn
+        with pytest.raises(sqlite3.OperationalError):
+            await conn.execute("DELETE FROM memories")
+
+    async def write(i):
+        await backend.execute(
+            "INSERT INTO memories (key, content) VALUES (?, ?)", f"k{i}", "c")
+        return await backend.fetchone(
+            "SELECT key FROM memories WHERE key = ?", f"k{i}")
+
+    rows = await asyncio.gather(*(write(i) for i in range(20)))
+    assert [r["key"] for r in rows] == [f"k{i}" for i in range(20)]
+
+    async with backend.transaction():
+        await backend.execute("INSERT INTO memories (key, content) VALUES ('tx', 'c')")
+        assert await backend.fetchone("SELECT key FROM memories WHERE key = 'tx'")
+    await backend.close()
+    assert backend._reader_conns == []
@@ -17,10 +17,12 @@ CREATE TABLE IF NOT EXISTS entries (
     related_files TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
 CREATE INDEX IF NOT EXISTS idx_entries_agent ON entries(agent);
 CREATE INDEX IF NOT EXISTS idx_entries_task_type ON entries(task_type);
 CREATE INDEX IF NOT EXISTS idx_entries_tags ON entries(tags);
+CREATE INDEX IF NOT EXISTS idx_entries_recent ON entries(timestamp DESC, title);
+-- Superseded by idx_entries_recent, which leads with the same column
+DROP INDEX IF EXISTS idx_entries_timestamp;
 
 -- Knowledge articles, guides, protocols
 CREATE TABLE IF NOT EXISTS knowledge_base (
@@ -66,6 +68,7 @@ CREATE INDEX IF NOT EXISTS idx_memories_status ON memories(status);
 CREATE INDEX IF NOT EXISTS idx_memories_type ON memories(memory_type);
 CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
 CREATE INDEX IF NOT EXISTS idx_memories_access ON memories(access_count);
+CREATE INDEX IF NOT EXISTS idx_memories_recall ON memories(memory_type, importance DESC, last_accessed DESC, status);
 
 -- Error signatures and resolutions
 CREATE TABLE IF NOT EXISTS error_patterns (
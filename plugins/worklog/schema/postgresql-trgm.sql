@@ -0,0 +1,33 @@
+-- Worklog PostgreSQL Trigram Indexes
+-- Optional: PostgreSQL only (SQLite uses FTS5 tables created by the MCP server)
+-- Requires: pg_trgm extension (bundled with PostgreSQL contrib)
+--
+-- search_knowledge and recall_context match with ILIKE '%term%'. A leading
+-- wildcard defeats btree indexes; GIN trigram indexes serve ILIKE directly,
+-- so no query changes are needed. Terms shorter than 3 characters still scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- memories: content, summary, key, tags
+CREATE INDEX IF NOT EXISTS idx_memories_content_trgm ON memories USING gin (content gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_memories_summary_trgm ON memories USING gin (summary gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_memories_key_trgm ON memories USING gin (key gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_memories_tags_trgm ON memories USING gin (tags gin_trgm_ops);
+
+-- knowledge_base: title, content, tags, category
+CREATE INDEX IF NOT EXISTS idx_kb_title_trgm ON knowledge_base USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_kb_content_trgm ON knowledge_base USING gin (content gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_kb_tags_trgm ON knowledge_base USING gin (tags gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_kb_category_trgm ON knowledge_base USING gin (category gin_trgm_ops);
+
+-- entries: title, details, outcome, tags
+CREATE INDEX IF NOT EXISTS idx_entries_title_trgm ON entries USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_entries_details_trgm ON entries USING gin (details gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_entries_outcome_trgm ON entries USING gin (outcome gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_entries_tags_trgm ON entries USING gin (tags gin_trgm_ops);
+
+-- research: title, summary, key_points, tags
+CREATE INDEX IF NOT EXISTS idx_research_title_trgm ON research USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_research_summary_trgm ON research USING gin (summary gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_research_key_points_trgm ON research USING gin (key_points gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_research_tags_trgm ON research USING gin (tags gin_trgm_ops);
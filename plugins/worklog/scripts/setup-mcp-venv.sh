@@ -99,7 +99,7 @@ elif [[ -f "$MCP_DIR/requirements.txt" ]]; then
     pip install -r "$MCP_DIR/requirements.txt" --quiet
 else
     # Fallback: install known dependencies
-    pip install fastmcp aiosqlite --quiet
+    pip install fastmcp aiosqlite orjson --quiet
 fi
 
 echo -e "${GREEN}Dependencies installed${NC}"